@@ -1,36 +1,44 @@
 # backend/app.py
+import time
+_import_started = time.perf_counter()
+
+import asyncio
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
-import time
-from sqlalchemy import text
 
-from backend.database import Base, engine
+from backend.database import engine, async_engine
+from backend import startup
+from backend.middleware import GzipRequestMiddleware, MetricsMiddleware, StreamingSafeGZipMiddleware
+from backend.profiling import QueryProfileMiddleware, install as install_sql_profiling
+from backend.tasks import ENRICH_WORKERS, EnrichmentWorkers
 from backend import models  # <-- import models BEFORE create_all so SQLAlchemy sees all tables
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # wait briefly for DB to be ready
-    for attempt in range(12):
-        try:
-            with engine.connect() as conn:
-                conn.execute(text("SELECT 1"))
-            break
-        except Exception as e:
-            print(f"[startup] DB not ready (attempt {attempt+1}/12): {e}")
-            time.sleep(5)
-
-    print("[startup] creating tables …")
-    try:
-        Base.metadata.create_all(bind=engine)
-        print("[startup] tables created")
-    except Exception as e:
-        print("[startup] create_all failed:", e)
+    # DB wait, schema check, workers and cache warm-up; see backend/startup.py
+    task = asyncio.create_task(startup.run(lambda: EnrichmentWorkers(ENRICH_WORKERS).start()))
+    if startup.STARTUP_MODE == "blocking":
+        await task
 
     yield
 
+    if not task.done():
+        task.cancel()
+    if startup.state.workers is not None:
+        startup.state.workers.stop()
+    if async_engine is not None:
+        await async_engine.dispose()
+
 
 app = FastAPI(title="Pirate Bounty Tracker API", version="2.0", lifespan=lifespan)
+app.add_middleware(StreamingSafeGZipMiddleware, minimum_size=1024)
+app.add_middleware(GzipRequestMiddleware)
+app.add_middleware(startup.ReadinessGate)
+app.add_middleware(QueryProfileMiddleware)  # no-op unless SQL_PROFILE=1
+app.add_middleware(MetricsMiddleware)  # outermost: times the whole request, gzip included
+
+install_sql_profiling(engine, async_engine.sync_engine if async_engine is not None else None)
 
 # Routers
 from backend.routers import events, bounties, players, roster, heatmap, ops
@@ -39,4 +47,6 @@ app.include_router(bounties.router, prefix="/api/v1")
 app.include_router(players.router,  prefix="/api/v1")
 app.include_router(roster.router,   prefix="/api/v1")
 app.include_router(heatmap.router,  prefix="/api/v1")
-app.include_router(ops.router)  # health/debug
\ No newline at end of file
+app.include_router(ops.router)  # health/debug
+
+startup.state.timings["import"] = round((time.perf_counter() - _import_started) * 1000, 1)
@@ -0,0 +1,65 @@
+# backend/broadcast.py
+"""In-process fan-out of newly ingested events to live stream subscribers.
+
+Each subscriber owns a bounded queue. publish() never blocks ingest: a subscriber
+whose queue is full is dropped (its stream ends and the client reconnects with
+Last-Event-ID to catch up from the database).
+"""
+import asyncio
+import os
+
+STREAM_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", "256"))
+STREAM_MAX_SUBSCRIBERS = int(os.getenv("STREAM_MAX_SUBSCRIBERS", "100"))
+
+
+class Subscriber:
+    def __init__(self, maxsize: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.dropped = False
+
+    def close(self):
+        """Discard pending items and wake the reader with the end-of-stream marker."""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class Broadcaster:
+    def __init__(self, maxsize: int = STREAM_QUEUE_SIZE, max_subscribers: int = STREAM_MAX_SUBSCRIBERS):
+        self.maxsize = maxsize
+        self.max_subscribers = max_subscribers
+        self.subscribers: set[Subscriber] = set()
+        self.stats = {"published": 0, "delivered": 0, "dropped_subscribers": 0}
+
+    def __bool__(self):
+        return bool(self.subscribers)
+
+    def subscribe(self) -> Subscriber | None:
+        """Register a subscriber; None when the subscriber limit is reached."""
+        if len(self.subscribers) >= self.max_subscribers:
+            return None
+        sub = Subscriber(self.maxsize)
+        self.subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber):
+        self.subscribers.discard(sub)
+
+    def publish(self, items):
+        """Queue items for every subscriber; must be called on the event loop."""
+        if not self.subscribers or not items:
+            return
+        self.stats["published"] += len(items)
+        for sub in list(self.subscribers):
+            try:
+                for item in items:
+                    sub.queue.put_nowait(item)
+                    self.stats["delivered"] += 1
+            except asyncio.QueueFull:
+                sub.dropped = True
+                self.subscribers.discard(sub)
+                self.stats["dropped_subscribers"] += 1
+                sub.close()
+
+
+broadcaster = Broadcaster()
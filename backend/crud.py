@@ -1,45 +1,288 @@
 # backend/crud.py
+import os
+from datetime import datetime, timedelta
+from sqlalchemy import case, func
 from sqlalchemy.orm import Session
-from backend.models import Player, Event
-
-def get_player_by_name(db: Session, name: str) -> Player | None:
-    return db.query(Player).filter(Player.name == name).first()
-
-def get_or_create_player_by_name(db: Session, name: str) -> Player:
-    p = get_player_by_name(db, name)
-    if p:
-        return p
-    p = Player(name=name)
-    db.add(p)
-    db.flush()
-    return p
-
-def create_event(db: Session, payload) -> Event:
-    ev = Event(
-        timestamp=payload.timestamp,
-        # denormalized names + org right on the Event row:
+from backend.cache import LRUCache
+from backend.models import Player, PlayerOrganization, Event, BodyStat, HotspotRollup, EnrichmentJob
+from backend.schemas import PirateProfile
+from backend.services.bodies import nearest_body
+from backend.timeparse import event_time
+from backend.services_ranking import decay_credit, player_stats_update, score_at
+
+PLAYER_CACHE_SIZE = int(os.getenv("PLAYER_CACHE_SIZE", "10000"))
+# a finished enrichment is redone when the handle shows up again after this long
+ENRICH_REFRESH = timedelta(days=float(os.getenv("ENRICH_REFRESH_DAYS", "7")))
+# name -> player_id; only ids already committed (seen via SELECT) are cached, so a
+# rolled-back insert can never leave a dangling id behind
+player_ids = LRUCache(PLAYER_CACHE_SIZE)
+
+# column-only projection for profile/leaderboard reads: no ORM identity map, no relationships
+PROFILE_COLUMNS = (
+    Player.player_id, Player.name, Player.org, Player.total_attacks, Player.total_kills,
+    Player.value_destroyed, Player.score, Player.rank_key,
+)
+
+def profile_query(db: Session):
+    return db.query(*PROFILE_COLUMNS)
+
+def to_profile(row, now: datetime | None = None, organizations: list[str] | None = None) -> PirateProfile:
+    return PirateProfile(
+        player_id=row.player_id or 0, name=row.name, org=row.org,
+        total_attacks=row.total_attacks or 0, total_kills=row.total_kills or 0,
+        value_destroyed=row.value_destroyed or 0.0, score=score_at(row.score, row.rank_key, now),
+        organizations=organizations,
+    )
+
+def player_org_sids(db: Session, player_id: int) -> list[str]:
+    return [sid for (sid,) in db.query(PlayerOrganization.org_sid).filter(PlayerOrganization.player_id == player_id)]
+
+def resolve_player_ids(db: Session, names) -> dict[str, int]:
+    """Map names to player ids, creating missing players with INSERT ... ON CONFLICT DO NOTHING.
+
+    Cached names cost nothing; the rest take one SELECT, and new names one upsert
+    (plus a re-SELECT for any name another worker inserted concurrently).
+    """
+    ids: dict[str, int] = {}
+    missing = set()
+    for n in {n for n in names if n}:
+        pid = player_ids.get(n)
+        if pid is None:
+            missing.add(n)
+        else:
+            ids[n] = pid
+    if not missing:
+        return ids
+
+    for pid, n in db.query(Player.player_id, Player.name).filter(Player.name.in_(missing)):
+        ids[n] = pid
+        player_ids.set(n, pid)
+    missing -= ids.keys()
+    if not missing:
+        return ids
+
+    now = datetime.utcnow()
+    insert = dialect_insert(db)
+    stmt = (
+        insert(Player.__table__)
+        .values([{"name": n, "first_seen": now, "last_seen": None, "total_attacks": 0, "total_kills": 0,
+                  "value_destroyed": 0.0, "score": 0.0} for n in sorted(missing)])
+        .on_conflict_do_nothing(index_elements=[Player.__table__.c.name])
+        .returning(Player.__table__.c.player_id, Player.__table__.c.name)
+    )
+    for pid, n in db.execute(stmt):
+        ids[n] = pid
+    missing -= ids.keys()
+    if missing:  # lost the race to a concurrent insert; those rows are committed, so cacheable
+        for pid, n in db.query(Player.player_id, Player.name).filter(Player.name.in_(missing)):
+            ids[n] = pid
+            player_ids.set(n, pid)
+    return ids
+
+def create_event_row(payload, attacker_id: int | None, victim_id: int | None,
+                     received_at: datetime | None = None) -> Event:
+    """Build (but do not add) an Event from an EventCreate, linked to resolved player ids."""
+    coords = payload.coords
+    body, body_distance = nearest_body(*((coords.x, coords.y, coords.z) if coords else (None, None, None)))
+    return Event(
+        timestamp=payload.timestamp,  # raw client string, kept for audit
+        occurred_at=event_time(payload.timestamp, received_at),
+        received_at=received_at or datetime.utcnow(),
+        attacker_id=attacker_id,
+        victim_id=victim_id,
         attacker_name=payload.attacker_name,
         attacker_org=payload.attacker_org,
         victim_name=payload.victim_name,
-
         zone=payload.zone,
-        x=payload.coords.x,
-        y=payload.coords.y,
-        z=payload.coords.z,
+        x=(payload.coords.x if payload.coords else None),
+        y=(payload.coords.y if payload.coords else None),
+        z=(payload.coords.z if payload.coords else None),
         weapon=payload.weapon,
         damage_type=payload.damage_type,
-        ship_value_estimate=payload.ship_value_estimate,
-        raw_line=payload.source_line,  # <— map source_line -> raw_line
-        # confirmed defaults True in your model; no need to pass it unless you want to override
+        ship_value_estimate=payload.ship_value_estimate or 0.0,
+        body=body,
+        body_distance=body_distance,
+        raw_line=payload.source_line,
+        event_key=payload.event_key,
+        confirmed=True,
     )
-    db.add(ev)
-    db.flush()  # allocates event_id
-    return ev
-
-def update_player_stats(db: Session, attacker: Player, victim: Player, ev: Event) -> None:
-    attacker.total_kills = (attacker.total_kills or 0) + 1
-    attacker.total_attacks = (attacker.total_attacks or 0) + 1
-    attacker.value_destroyed = (attacker.value_destroyed or 0) + (ev.ship_value_estimate or 0.0)
-    victim.total_attacks = (victim.total_attacks or 0) + 1
-    db.add(attacker)
-    db.add(victim)
\ No newline at end of file
+
+def counted_at(ev, received_at: datetime | None = None) -> datetime | None:
+    """When an event counts in aggregates: occurred_at, else when it was received.
+
+    Python side of COUNTED_AT, so ingest and a rebuild from stored rows agree."""
+    return ev.occurred_at or ev.received_at or received_at
+
+# SQL side of counted_at(); NULL only for rows stored before events.received_at existed
+COUNTED_AT = func.coalesce(Event.occurred_at, Event.received_at)
+
+def update_player_stats(db: Session, events, received_at: datetime | None = None) -> None:
+    """Apply kill/attack/value deltas for these events with server-side increments.
+
+    One executemany UPDATE ... SET total_kills = total_kills + :dk ... per batch, so
+    concurrent ingests on other workers never lose an update.
+    """
+    received_at = received_at or datetime.utcnow()
+    deltas: dict[int, list] = {}  # player_id -> [kills, attacks, value, latest event time]
+    for ev in events:
+        when = counted_at(ev, received_at)  # NULL occurred_at: timestamp couldn't be placed
+        for pid, kills, value in ((ev.attacker_id, 1, ev.ship_value_estimate or 0.0), (ev.victim_id, 0, 0.0)):
+            if pid is None:
+                continue
+            d = deltas.setdefault(pid, [0, 0, 0.0, when])
+            d[0] += kills
+            d[1] += 1
+            d[2] += value
+            d[3] = max(d[3], when)
+    if not deltas:
+        return
+    params = [
+        {"pid": pid, "dk": dk, "da": da, "dv": dv, "seen": seen, "seen_credit": decay_credit(seen)}
+        for pid, (dk, da, dv, seen) in deltas.items()
+    ]
+    db.execute(player_stats_update(Player.__table__), params)
+
+def dialect_insert(db: Session):
+    """Dialect-specific insert() so ON CONFLICT upserts work on both Postgres and SQLite."""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+def bump_body_stats(db: Session, events) -> None:
+    """Fold confirmed events into the per-body hotspot counters with one upsert per body."""
+    agg: dict[str, list] = {}
+    for ev in events:
+        if not ev.body or ev.confirmed is False:
+            continue
+        cur = agg.get(ev.body)
+        if cur is None:
+            agg[ev.body] = [1, ev.x, ev.y, ev.z, ev.body_distance]
+            continue
+        cur[0] += 1
+        if ev.body_distance is not None and (cur[4] is None or ev.body_distance < cur[4]):
+            cur[1:] = [ev.x, ev.y, ev.z, ev.body_distance]
+    if not agg:
+        return
+    insert = dialect_insert(db)
+    t = BodyStat.__table__
+    for body, (count, x, y, z, dist) in agg.items():
+        stmt = insert(t).values(body=body, event_count=count, sample_x=x, sample_y=y, sample_z=z, sample_distance=dist)
+        closer = (t.c.sample_distance.is_(None)) | (stmt.excluded.sample_distance < t.c.sample_distance)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[t.c.body],
+            set_={
+                "event_count": t.c.event_count + stmt.excluded.event_count,
+                "sample_x": case((closer, stmt.excluded.sample_x), else_=t.c.sample_x),
+                "sample_y": case((closer, stmt.excluded.sample_y), else_=t.c.sample_y),
+                "sample_z": case((closer, stmt.excluded.sample_z), else_=t.c.sample_z),
+                "sample_distance": case((closer, stmt.excluded.sample_distance), else_=t.c.sample_distance),
+            },
+        )
+        db.execute(stmt)
+
+ROLLUP_GRANULARITIES = ("hour", "day")
+
+def bucket_start(when: datetime, granularity: str) -> datetime:
+    if granularity == "day":
+        return when.replace(hour=0, minute=0, second=0, microsecond=0)
+    return when.replace(minute=0, second=0, microsecond=0)
+
+def bump_hotspot_rollups(db: Session, events, received_at: datetime | None = None) -> None:
+    """Add confirmed events to the hourly and daily per-body/zone buckets."""
+    received_at = received_at or datetime.utcnow()
+    agg: dict[tuple, int] = {}
+    for ev in events:
+        if not ev.body or ev.confirmed is False:
+            continue
+        when = counted_at(ev, received_at)
+        if when is None:
+            continue
+        for g in ROLLUP_GRANULARITIES:
+            key = (g, bucket_start(when, g), ev.body, ev.zone or "")
+            agg[key] = agg.get(key, 0) + 1
+    if not agg:
+        return
+    insert = dialect_insert(db)
+    t = HotspotRollup.__table__
+    for (g, start, body, zone), count in agg.items():
+        stmt = insert(t).values(granularity=g, bucket_start=start, body=body, zone=zone, event_count=count)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[t.c.granularity, t.c.bucket_start, t.c.body, t.c.zone],
+            set_={"event_count": t.c.event_count + stmt.excluded.event_count},
+        )
+        db.execute(stmt)
+
+def _insert_keyed(db: Session, events: list[Event]) -> dict[str, int]:
+    """INSERT ... ON CONFLICT (event_key) DO NOTHING for keyed events; returns event_key -> new event_id."""
+    t = Event.__table__
+    cols = [c.key for c in t.columns if c.key != "event_id"]
+    stmt = (
+        dialect_insert(db)(t)
+        .values([{c: getattr(ev, c) for c in cols} for ev in events])
+        .on_conflict_do_nothing(index_elements=[t.c.event_key])
+        .returning(t.c.event_id, t.c.event_key)
+    )
+    return {key: eid for eid, key in db.execute(stmt)}
+
+def ingest_events(db: Session, payloads, received_at: datetime | None = None) -> tuple[list[Event], set[int]]:
+    """Write events plus every derived counter in the caller's transaction (flushed, not committed).
+
+    Returns (events aligned with payloads, indexes of duplicates). A payload whose
+    event_key is already stored (or repeated earlier in the batch) is not written
+    again; its slot holds the stored Event and nothing is counted for it.
+    """
+    received_at = received_at or datetime.utcnow()
+    first: dict[str, int] = {}
+    fresh = [i for i, p in enumerate(payloads) if not p.event_key or first.setdefault(p.event_key, i) == i]
+    ids = resolve_player_ids(db, [n for i in fresh for n in (payloads[i].attacker_name, payloads[i].victim_name)])
+    rows = {i: create_event_row(payloads[i], ids.get(payloads[i].attacker_name), ids.get(payloads[i].victim_name),
+                                received_at) for i in fresh}
+    plain = [ev for ev in rows.values() if ev.event_key is None]
+    if plain:
+        db.add_all(plain)
+        db.flush()  # one batched INSERT ... RETURNING allocates every event_id (row by row on SQLite)
+    keyed = [ev for ev in rows.values() if ev.event_key is not None]
+    inserted = _insert_keyed(db, keyed) if keyed else {}
+    for ev in keyed:
+        ev.event_id = inserted.get(ev.event_key)  # stays transient: counters below read its fields only
+    new = [ev for ev in rows.values() if ev.event_id is not None]
+    update_player_stats(db, new, received_at)
+    record_aggregates(db, new, received_at)
+    enqueue_enrichment(db, {p.attacker_name: ids.get(p.attacker_name) for i, p in enumerate(payloads)
+                            if i in rows and rows[i].event_id is not None and not p.attacker_org and p.attacker_name})
+
+    dup_keys = {p.event_key for i, p in enumerate(payloads) if p.event_key and (i not in rows or rows[i].event_id is None)}
+    stored = {ev.event_key: ev for ev in db.query(Event).filter(Event.event_key.in_(dup_keys))} if dup_keys else {}
+    events, duplicates = [], set()
+    for i, p in enumerate(payloads):
+        ev = rows.get(i)
+        if ev is None or ev.event_id is None:
+            duplicates.add(i)
+            ev = stored[p.event_key]
+        events.append(ev)
+    return events, duplicates
+
+def enqueue_enrichment(db: Session, handles: dict[str, int | None]) -> None:
+    """Queue org lookups, one job per handle; stale finished jobs are re-queued, live ones left alone."""
+    if not handles:
+        return
+    now = datetime.utcnow()
+    insert = dialect_insert(db)
+    t = EnrichmentJob.__table__
+    stmt = insert(t).values([
+        {"handle": h, "player_id": pid, "status": "pending", "attempts": 0, "next_attempt_at": now, "updated_at": now}
+        for h, pid in sorted(handles.items())  # stable key order avoids upsert deadlocks between batches
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[t.c.handle],
+        set_={"status": "pending", "attempts": 0, "next_attempt_at": now, "updated_at": now},
+        where=(t.c.status.in_(("done", "failed"))) & (t.c.updated_at < now - ENRICH_REFRESH),
+    )
+    db.execute(stmt)
+
+def record_aggregates(db: Session, events, received_at: datetime | None = None) -> None:
+    """Maintain every ingest-time aggregate for newly confirmed events."""
+    bump_body_stats(db, events)
+    bump_hotspot_rollups(db, events, received_at)
@@ -3,12 +3,14 @@ from sqlalchemy.orm import sessionmaker, declarative_base
 import os
 from dotenv import load_dotenv
 load_dotenv()
+from backend import db_profiles  # reads DB_PROFILE / PG_POOL_MODE, so after load_dotenv
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./app.db")
 if DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql+psycopg://", 1)
 elif DATABASE_URL.startswith("postgresql://"):
     DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+psycopg://", 1)
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {})
+engine = create_engine(DATABASE_URL, **db_profiles.engine_options(DATABASE_URL))
+db_profiles.install(engine, DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 def get_db():
@@ -17,3 +19,45 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# ---- optional async engine (DB_ASYNC=1): psycopg async for Postgres, aiosqlite locally ----
+DB_ASYNC = os.getenv("DB_ASYNC", "0") == "1"
+
+def _async_url(url: str) -> str:
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    return url  # postgresql+psycopg picks its async variant under create_async_engine
+
+async_engine = None
+AsyncSessionLocal = None
+if DB_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+    # SQLite has a single writer; one pooled connection queues async sessions instead of
+    # letting two deferred transactions deadlock on the SHARED -> RESERVED lock upgrade
+    async_engine = create_async_engine(
+        _async_url(DATABASE_URL),
+        **db_profiles.engine_options(DATABASE_URL),
+        **({"poolclass": AsyncAdaptedQueuePool, "pool_size": 1, "max_overflow": 0}
+           if DATABASE_URL.startswith("sqlite") else {}),
+    )
+    db_profiles.install(async_engine.sync_engine, DATABASE_URL)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# what routers depend on: an AsyncSession when DB_ASYNC=1, else the sync Session
+get_session = get_async_db if DB_ASYNC else get_db
+
+async def run_db(db, fn, *args, **kwargs):
+    """Run fn(sync_session, ...) without blocking the event loop.
+
+    Async mode hands fn the AsyncSession's sync facade (I/O awaits on the loop);
+    the sync fallback runs it on the threadpool as FastAPI does for `def` routes.
+    """
+    if DB_ASYNC:
+        return await db.run_sync(fn, *args, **kwargs)
+    from starlette.concurrency import run_in_threadpool
+    return await run_in_threadpool(fn, db, *args, **kwargs)
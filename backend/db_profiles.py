@@ -0,0 +1,96 @@
+# backend/db_profiles.py
+"""Engine settings per backend, selected with DB_PROFILE.
+
+  DB_PROFILE=tuned (default)
+    SQLite   - WAL journal, synchronous=NORMAL, larger page cache, memory temp store,
+               busy timeout (SQLITE_BUSY_TIMEOUT seconds) instead of failing on a lock
+    Postgres - sized QueuePool with pre-ping and recycle, server-side statement and
+               idle-in-transaction timeouts sent as startup options
+  DB_PROFILE=default
+    create_engine defaults, as before
+
+  PG_POOL_MODE=pgbouncer (Postgres, tuned)
+    for a transaction-pooling PgBouncer: no client-side pool (NullPool), psycopg
+    prepared statements off, and the statement timeout applied with SET LOCAL at the
+    start of each transaction because PgBouncer rejects startup options
+"""
+import os
+
+from sqlalchemy import event
+from sqlalchemy.pool import NullPool
+
+DB_PROFILE = os.getenv("DB_PROFILE", "tuned")
+PG_POOL_MODE = os.getenv("PG_POOL_MODE", "session")
+
+SQLITE_BUSY_TIMEOUT = float(os.getenv("SQLITE_BUSY_TIMEOUT", "10"))
+SQLITE_CACHE_MB = int(os.getenv("SQLITE_CACHE_MB", "32"))
+
+PG_POOL_SIZE = int(os.getenv("PG_POOL_SIZE", "5"))
+PG_MAX_OVERFLOW = int(os.getenv("PG_MAX_OVERFLOW", "10"))
+PG_POOL_TIMEOUT = float(os.getenv("PG_POOL_TIMEOUT", "10"))
+PG_POOL_RECYCLE = int(os.getenv("PG_POOL_RECYCLE", "1800"))
+PG_STATEMENT_TIMEOUT_MS = int(os.getenv("PG_STATEMENT_TIMEOUT_MS", "15000"))
+PG_IDLE_TX_TIMEOUT_MS = int(os.getenv("PG_IDLE_TX_TIMEOUT_MS", "60000"))
+PG_CONNECT_TIMEOUT = int(os.getenv("PG_CONNECT_TIMEOUT", "10"))
+
+
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def engine_options(url: str) -> dict:
+    """Keyword arguments for create_engine / create_async_engine."""
+    if _is_sqlite(url):
+        opts = {"connect_args": {"check_same_thread": False}}
+        if DB_PROFILE == "tuned":
+            opts["connect_args"]["timeout"] = SQLITE_BUSY_TIMEOUT
+        return opts
+    if DB_PROFILE != "tuned":
+        return {}
+    if PG_POOL_MODE == "pgbouncer":
+        # PgBouncer owns pooling; psycopg must not PREPARE across pooled server connections
+        return {"poolclass": NullPool,
+                "connect_args": {"prepare_threshold": None, "connect_timeout": PG_CONNECT_TIMEOUT}}
+    return {
+        "pool_size": PG_POOL_SIZE,
+        "max_overflow": PG_MAX_OVERFLOW,
+        "pool_timeout": PG_POOL_TIMEOUT,
+        "pool_recycle": PG_POOL_RECYCLE,
+        "pool_pre_ping": True,
+        "connect_args": {
+            "connect_timeout": PG_CONNECT_TIMEOUT,
+            "options": f"-c statement_timeout={PG_STATEMENT_TIMEOUT_MS}"
+                       f" -c idle_in_transaction_session_timeout={PG_IDLE_TX_TIMEOUT_MS}",
+        },
+    }
+
+
+def install(engine, url: str) -> None:
+    """Per-connection setup that cannot be passed to create_engine (engine: a sync Engine)."""
+    if DB_PROFILE != "tuned":
+        return
+    if _is_sqlite(url):
+        memory = url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url
+
+        @event.listens_for(engine, "connect")
+        def _sqlite_pragmas(dbapi_conn, record):
+            cur = dbapi_conn.cursor()
+            if not memory:
+                cur.execute("PRAGMA journal_mode=WAL")  # readers no longer block on a writer
+            cur.execute("PRAGMA synchronous=NORMAL")      # durable at checkpoints; safe with WAL
+            cur.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_MB * 1024}")
+            cur.execute("PRAGMA temp_store=MEMORY")
+            cur.execute(f"PRAGMA busy_timeout={int(SQLITE_BUSY_TIMEOUT * 1000)}")
+            cur.close()
+    elif PG_POOL_MODE == "pgbouncer" and PG_STATEMENT_TIMEOUT_MS:
+        @event.listens_for(engine, "begin")
+        def _statement_timeout(conn):
+            conn.exec_driver_sql(f"SET LOCAL statement_timeout = {PG_STATEMENT_TIMEOUT_MS}")
+
+
+def describe(url: str) -> dict:
+    backend = "sqlite" if _is_sqlite(url) else "postgres"
+    out = {"profile": DB_PROFILE, "backend": backend}
+    if backend == "postgres" and DB_PROFILE == "tuned":
+        out["pool_mode"] = PG_POOL_MODE
+    return out
@@ -0,0 +1,92 @@
+# backend/metrics.py
+"""In-process metrics rendered in the Prometheus text exposition format.
+
+Only counters and fixed-bucket histograms, kept in plain dicts behind one lock.
+Point-in-time values (queue depth, pool usage, cache ratios) are gauges that
+/ops/metrics computes at scrape time, so nothing is sampled in the request path.
+"""
+import bisect
+import threading
+import time
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_lock = threading.Lock()
+_counters: dict[tuple[str, tuple], float] = {}
+_histograms: dict[tuple[str, tuple], list] = {}  # -> [bucket counts..., +Inf count, sum]
+_help: dict[str, tuple[str, str]] = {}           # name -> (type, help)
+started_at = time.time()
+
+
+def describe(name: str, kind: str, text: str):
+    _help[name] = (kind, text)
+
+
+def inc(name: str, value: float = 1.0, **labels):
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0.0) + value
+
+
+def observe(name: str, value: float, **labels):
+    key = (name, tuple(sorted(labels.items())))
+    i = bisect.bisect_left(LATENCY_BUCKETS, value)
+    with _lock:
+        h = _histograms.get(key)
+        if h is None:
+            h = _histograms[key] = [0] * (len(LATENCY_BUCKETS) + 1) + [0.0]
+        h[i] += 1
+        h[-1] += value
+
+
+def _labels(pairs) -> str:
+    if not pairs:
+        return ""
+    esc = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in pairs) + "}"
+
+
+def _header(lines: list, name: str, default_kind: str, seen: set):
+    if name in seen:
+        return
+    seen.add(name)
+    kind, text = _help.get(name, (default_kind, ""))
+    if text:
+        lines.append(f"# HELP {name} {text}")
+    lines.append(f"# TYPE {name} {kind}")
+
+
+def render(gauges: dict[str, list[tuple[dict, float]]] | None = None) -> str:
+    """All counters and histograms plus the given {name: [(labels, value)]} gauges."""
+    with _lock:
+        counters = dict(_counters)
+        histograms = {k: list(v) for k, v in _histograms.items()}
+    lines, seen = [], set()
+    for (name, labels), value in sorted(counters.items()):
+        _header(lines, name, "counter", seen)
+        lines.append(f"{name}{_labels(labels)} {value:g}")
+    for (name, labels), h in sorted(histograms.items()):
+        _header(lines, name, "histogram", seen)
+        cumulative = 0
+        for bound, n in zip(LATENCY_BUCKETS + (float("inf"),), h[:-1]):
+            cumulative += n
+            le = "+Inf" if bound == float("inf") else f"{bound:g}"
+            lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+        lines.append(f"{name}_sum{_labels(labels)} {h[-1]:.6f}")
+        lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+    for name, samples in (gauges or {}).items():
+        _header(lines, name, "gauge", seen)
+        for labels, value in samples:
+            if value is not None:
+                lines.append(f"{name}{_labels(tuple(sorted(labels.items())))} {value:g}")
+    return "\n".join(lines) + "\n"
+
+
+describe("http_requests_total", "counter", "HTTP requests by route template, method and status.")
+describe("http_request_duration_seconds", "histogram", "HTTP request latency by route template and method.")
+describe("events_ingested_total", "counter", "Events committed through POST /events and /events/batch.")
+describe("enrichment_jobs_total", "counter", "Enrichment jobs finished by this process's workers, by result.")
+describe("stream_dropped_subscribers_total", "counter", "Event stream subscribers dropped for falling behind.")
+describe("enrichment_queue_jobs", "gauge", "Rows in enrichment_jobs by status (shared across processes).")
+describe("db_pool_connections", "gauge", "SQLAlchemy pool connections by state.")
+describe("cache_hit_ratio", "gauge", "Hits / lookups since process start.")
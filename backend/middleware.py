@@ -0,0 +1,100 @@
+# backend/middleware.py
+import gzip
+import time
+import zlib
+
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend import metrics
+
+MAX_INFLATED_BYTES = 10 * 1024 * 1024
+
+
+class GzipRequestMiddleware:
+    """Inflate `Content-Encoding: gzip` request bodies (batch uploads from the watcher)."""
+
+    def __init__(self, app: ASGIApp, max_size: int = MAX_INFLATED_BYTES):
+        self.app = app
+        self.max_size = max_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        headers = dict(scope.get("headers") or [])
+        if headers.get(b"content-encoding", b"").lower() != b"gzip":
+            return await self.app(scope, receive, send)
+
+        chunks = []
+        more = True
+        while more:
+            msg = await receive()
+            chunks.append(msg.get("body", b""))
+            more = msg.get("more_body", False)
+        try:
+            d = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            body = d.decompress(b"".join(chunks), self.max_size)
+            if d.unconsumed_tail:
+                raise ValueError("body too large")
+        except (zlib.error, ValueError, gzip.BadGzipFile) as e:
+            await send({"type": "http.response.start", "status": 400,
+                        "headers": [(b"content-type", b"text/plain")]})
+            await send({"type": "http.response.body", "body": f"Bad gzip body: {e}".encode()})
+            return
+
+        new_headers = [(k, v) for k, v in scope["headers"] if k not in (b"content-encoding", b"content-length")]
+        new_headers.append((b"content-length", str(len(body)).encode()))
+        # in place, not a copy: outer middleware (metrics, SQL profiling) read the route the router sets here
+        scope["headers"] = new_headers
+        sent = False
+
+        async def inflated_receive() -> Message:
+            nonlocal sent
+            if sent:
+                return await receive()
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        await self.app(scope, inflated_receive, send)
+
+
+class StreamingSafeGZipMiddleware(GZipMiddleware):
+    """Response gzip that leaves Server-Sent Events alone (gzip would buffer them indefinitely)."""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 500, stream_paths: tuple[str, ...] = ("/stream",)):
+        super().__init__(app, minimum_size=minimum_size)
+        self.stream_paths = stream_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http" and scope["path"].endswith(self.stream_paths):
+            return await self.app(scope, receive, send)
+        await super().__call__(scope, receive, send)
+
+
+class MetricsMiddleware:
+    """Per-route request counts and latency histograms, labelled by route template."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        status = 500
+        t0 = time.perf_counter()
+
+        async def send_wrapper(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # the router leaves the matched route in scope; templates keep label cardinality bounded
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            metrics.inc("http_requests_total", route=path, method=method, status=str(status))
+            metrics.observe("http_request_duration_seconds", time.perf_counter() - t0, route=path, method=method)
@@ -0,0 +1,408 @@
+# backend/migrations.py
+"""Additive, idempotent schema upgrades for databases created before a column existed.
+
+create_all() only creates missing tables, so new columns on existing tables are
+added here with plain ALTER TABLE and then backfilled once.
+"""
+import os
+from contextlib import contextmanager
+from datetime import datetime
+
+from sqlalchemy import bindparam, func, inspect, text
+from sqlalchemy.exc import DatabaseError
+from sqlalchemy.engine import Engine
+
+from backend.database import SessionLocal
+
+# table -> [(column, DDL type)]
+ADDED_COLUMNS = {
+    "players": [("rank_key", "FLOAT")],
+    "events": [("body", "VARCHAR"), ("body_distance", "FLOAT"), ("occurred_at", "TIMESTAMP"),
+               ("event_key", "VARCHAR(64)"), ("received_at", "TIMESTAMP")],
+}
+
+ADDED_INDEXES = [
+    ("ix_players_rank_key", "players", "rank_key"),
+    ("ix_events_body", "events", "body"),
+    ("ix_events_occurred_at_id", "events", "occurred_at, event_id"),
+    ("ix_events_attacker_name_id", "events", "attacker_name, event_id"),
+    ("ix_events_victim_name_id", "events", "victim_name, event_id"),
+    ("ix_events_attacker_org_id", "events", "attacker_org, event_id"),
+    ("ix_events_zone_id", "events", "zone, event_id"),
+    ("ix_events_damage_type_id", "events", "damage_type, event_id"),
+    ("ix_events_confirmed_id", "events", "confirmed, event_id"),
+]
+
+# single-column indexes made redundant by a composite with the same leading column
+DROPPED_INDEXES = [
+    ("ix_events_attacker_name", "events"),
+    ("ix_events_victim_name", "events"),
+    ("ix_events_attacker_org", "events"),
+    ("ix_events_occurred_at", "events"),
+]
+
+BACKFILL_BATCH = 1000
+
+# Bump whenever models or the lists above change; startup skips create_all + upgrade()
+# (and their schema reflection) when the database already records this version.
+SCHEMA_VERSION = 6
+SCHEMA_LOCK_ID = 0x50697261  # pg_advisory_lock key shared by every worker process
+
+
+def _backfill_rank_keys():
+    from backend.services_ranking import recompute_scores
+    db = SessionLocal()
+    try:
+        recompute_scores(db)
+    finally:
+        db.close()
+
+
+def _backfill_event_bodies():
+    """Assign nearest body to historical events in id-ordered batches, then rebuild body_stats."""
+    from backend.models import Event, BodyStat
+    from backend.services.bodies import nearest_body
+    import backend.crud as crud
+    db = SessionLocal()
+    try:
+        last_id = 0
+        while True:
+            batch = (
+                db.query(Event)
+                .filter(Event.event_id > last_id)
+                .order_by(Event.event_id)
+                .limit(BACKFILL_BATCH)
+                .all()
+            )
+            if not batch:
+                break
+            for ev in batch:
+                ev.body, ev.body_distance = nearest_body(ev.x, ev.y, ev.z)
+            last_id = batch[-1].event_id
+            db.commit()
+        db.query(BodyStat).delete()
+        last_id = 0
+        while True:
+            batch = (
+                db.query(Event)
+                .filter(Event.event_id > last_id, Event.confirmed == True)  # noqa: E712
+                .order_by(Event.event_id)
+                .limit(BACKFILL_BATCH)
+                .all()
+            )
+            if not batch:
+                break
+            crud.bump_body_stats(db, batch)
+            last_id = batch[-1].event_id
+        db.commit()
+    finally:
+        db.close()
+
+
+def _backfill_event_times():
+    """Parse every stored timestamp string into occurred_at, in id-ordered batches.
+
+    Rows are never re-read as ORM objects: one column-only SELECT and one
+    executemany UPDATE per batch. Timestamps that can't be placed stay NULL."""
+    from backend.models import Event
+    from backend.timeparse import event_time
+    t = Event.__table__
+    stmt = t.update().where(t.c.event_id == bindparam("eid")).values(occurred_at=bindparam("when"))
+    db = SessionLocal()
+    try:
+        last_id = 0
+        while True:
+            batch = (
+                db.query(Event.event_id, Event.timestamp)
+                .filter(Event.event_id > last_id, Event.occurred_at.is_(None))
+                .order_by(Event.event_id)
+                .limit(BACKFILL_BATCH)
+                .all()
+            )
+            if not batch:
+                break
+            rows = [{"eid": eid, "when": when} for eid, ts in batch if (when := event_time(ts)) is not None]
+            if rows:
+                db.execute(stmt, rows)
+                db.commit()
+            last_id = batch[-1].event_id
+    finally:
+        db.close()
+
+
+# column -> one-off backfill run right after the column is added
+BACKFILLS = {
+    ("players", "rank_key"): _backfill_rank_keys,
+    ("events", "body"): _backfill_event_bodies,
+    ("events", "occurred_at"): _backfill_event_times,
+}
+
+
+def _backfill_hotspot_rollups():
+    """Rebuild hourly/daily rollups from confirmed events (run when the table is empty).
+
+    Events are bucketed at crud.COUNTED_AT, as ingest does; only rows stored before
+    received_at existed and whose time never parsed have nowhere to go."""
+    from backend.models import Event
+    import backend.crud as crud
+    db = SessionLocal()
+    try:
+        last_id = 0
+        while True:
+            batch = (
+                db.query(Event)
+                .filter(Event.event_id > last_id, Event.confirmed == True,  # noqa: E712
+                        crud.COUNTED_AT.isnot(None))
+                .order_by(Event.event_id)
+                .limit(BACKFILL_BATCH)
+                .all()
+            )
+            if not batch:
+                break
+            crud.bump_hotspot_rollups(db, batch)
+            last_id = batch[-1].event_id
+        db.commit()
+    finally:
+        db.close()
+
+
+def _dedupe_player_names(conn):
+    """Merge duplicate-name players into the lowest id so a unique index can be built."""
+    dups = conn.execute(text(
+        "SELECT name, MIN(player_id) FROM players WHERE name IS NOT NULL GROUP BY name HAVING COUNT(*) > 1"
+    )).all()
+    for name, keep in dups:
+        ids = [r[0] for r in conn.execute(
+            text("SELECT player_id FROM players WHERE name = :n AND player_id <> :k"), {"n": name, "k": keep})]
+        ids_param = bindparam("ids", expanding=True)
+        conn.execute(text("UPDATE events SET attacker_id = :k WHERE attacker_id IN :ids").bindparams(ids_param),
+                     {"k": keep, "ids": ids})
+        conn.execute(text("UPDATE events SET victim_id = :k WHERE victim_id IN :ids").bindparams(ids_param),
+                     {"k": keep, "ids": ids})
+        conn.execute(text(
+            "DELETE FROM player_organizations WHERE player_id IN :ids AND org_sid IN "
+            "(SELECT org_sid FROM player_organizations WHERE player_id = :k)").bindparams(ids_param),
+            {"k": keep, "ids": ids})
+        conn.execute(text("UPDATE player_organizations SET player_id = :k WHERE player_id IN :ids").bindparams(ids_param),
+                     {"k": keep, "ids": ids})
+        conn.execute(text(
+            "UPDATE players SET"
+            " total_attacks = (SELECT SUM(COALESCE(total_attacks, 0)) FROM players WHERE name = :n),"
+            " total_kills = (SELECT SUM(COALESCE(total_kills, 0)) FROM players WHERE name = :n),"
+            " value_destroyed = (SELECT SUM(COALESCE(value_destroyed, 0)) FROM players WHERE name = :n),"
+            " first_seen = (SELECT MIN(first_seen) FROM players WHERE name = :n),"
+            " last_seen = (SELECT MAX(last_seen) FROM players WHERE name = :n)"
+            " WHERE player_id = :k"), {"n": name, "k": keep})
+        conn.execute(text("DELETE FROM players WHERE player_id IN :ids").bindparams(ids_param), {"ids": ids})
+    return len(dups)
+
+
+# (index, table, column, prepare) -> existing non-unique index rebuilt as UNIQUE after prepare(conn)
+def _new_column(conn):
+    """Nothing to merge: the column was just added, so every value is NULL."""
+    return False
+
+
+UNIQUE_INDEXES = [
+    ("ix_players_name", "players", "name", _dedupe_player_names),
+    ("ix_events_event_key", "events", "event_key", _new_column),
+]
+
+
+def _repair_game_year_times():
+    """Version 2: in-universe timestamps used to be stored as the ingest/backfill time.
+
+    Re-derive occurred_at from the raw string wherever it now parses to something
+    else, then rebuild what was computed from it: hotspot rollups, players'
+    last_seen and their rank keys. Rows that still can't be placed keep their value.
+    """
+    from backend.models import Event, HotspotRollup, Player
+    from backend.timeparse import event_time
+    import backend.crud as crud
+    t = Event.__table__
+    stmt = t.update().where(t.c.event_id == bindparam("eid")).values(occurred_at=bindparam("when"))
+    changed = 0
+    db = SessionLocal()
+    try:
+        last_id = 0
+        while True:
+            batch = (
+                db.query(Event.event_id, Event.timestamp, Event.occurred_at)
+                .filter(Event.event_id > last_id)
+                .order_by(Event.event_id)
+                .limit(BACKFILL_BATCH)
+                .all()
+            )
+            if not batch:
+                break
+            rows = [{"eid": eid, "when": when} for eid, ts, old in batch
+                    if (when := event_time(ts)) is not None and when != old]
+            if rows:
+                db.execute(stmt, rows)
+                db.commit()
+                changed += len(rows)
+            last_id = batch[-1].event_id
+        if not changed:
+            return
+        seen: dict[int, datetime] = {}
+        for col in (Event.attacker_id, Event.victim_id):
+            for pid, latest in db.query(col, func.max(crud.COUNTED_AT)).filter(col.isnot(None)).group_by(col):
+                if latest is not None and (pid not in seen or latest > seen[pid]):
+                    seen[pid] = latest
+        p = Player.__table__
+        if seen:
+            db.execute(p.update().where(p.c.player_id == bindparam("pid")).values(last_seen=bindparam("seen")),
+                       [{"pid": pid, "seen": when} for pid, when in seen.items()])
+        db.query(HotspotRollup).delete()
+        db.commit()
+    finally:
+        db.close()
+    _backfill_hotspot_rollups()
+    _backfill_rank_keys()
+
+
+# stored version -> repairs to run when upgrading a database stamped below it
+VERSION_STEPS = {
+    2: [_repair_game_year_times],
+}
+
+
+# derived table -> rebuild run when it is empty but events already exist
+TABLE_BACKFILLS = {
+    "hotspot_rollups": _backfill_hotspot_rollups,
+}
+
+
+def upgrade(engine: Engine) -> list[str]:
+    """Add any missing columns/indexes; returns the list of applied steps."""
+    insp = inspect(engine)
+    tables = set(insp.get_table_names())
+    applied, pending = [], []
+    with engine.begin() as conn:
+        for table, cols in ADDED_COLUMNS.items():
+            if table not in tables:
+                continue
+            have = {c["name"] for c in insp.get_columns(table)}
+            for name, ddl in cols:
+                if name not in have:
+                    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}"))
+                    applied.append(f"{table}.{name}")
+                    if (table, name) in BACKFILLS:
+                        pending.append(BACKFILLS[(table, name)])
+        for ix, table, cols in ADDED_INDEXES:
+            if table not in tables:
+                continue
+            if ix not in {i["name"] for i in insp.get_indexes(table)}:
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS {ix} ON {table} ({cols})"))
+                applied.append(ix)
+        for ix, table in DROPPED_INDEXES:
+            if table in tables and ix in {i["name"] for i in insp.get_indexes(table)}:
+                conn.execute(text(f"DROP INDEX {ix}"))
+                applied.append(f"-{ix}")
+        for ix, table, col, prepare in UNIQUE_INDEXES:
+            if table not in tables:
+                continue
+            existing = {i["name"]: i for i in insp.get_indexes(table)}
+            if ix in existing and existing[ix].get("unique"):
+                continue
+            if prepare(conn):
+                pending.append(_backfill_rank_keys)
+            if ix in existing:
+                conn.execute(text(f"DROP INDEX {ix}"))
+            conn.execute(text(f"CREATE UNIQUE INDEX {ix} ON {table} ({col})"))
+            applied.append(f"{ix} (unique)")
+        if "events" in tables and conn.execute(text("SELECT 1 FROM events LIMIT 1")).first():
+            for table, fn in TABLE_BACKFILLS.items():
+                if table in tables and not conn.execute(text(f"SELECT 1 FROM {table} LIMIT 1")).first():
+                    applied.append(f"{table} (rebuilt)")
+                    pending.append(fn)
+    for fn in pending:
+        fn()
+    return applied
+
+
+def stored_version(engine: Engine) -> int | None:
+    try:
+        with engine.connect() as conn:
+            return conn.execute(text("SELECT version FROM schema_version WHERE id = 1")).scalar()
+    except Exception:  # table missing on databases older than the version row
+        return None
+
+
+def stamp_version(engine: Engine) -> None:
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM schema_version"))
+        conn.execute(text("INSERT INTO schema_version (id, version, applied_at) VALUES (1, :v, :at)"),
+                     {"v": SCHEMA_VERSION, "at": datetime.utcnow()})
+
+
+@contextmanager
+def schema_lock(engine: Engine):
+    """Serialize schema changes across worker processes.
+
+    Postgres: a session-level advisory lock on its own connection. SQLite: an
+    exclusive flock on a file next to the database (in-memory databases are
+    private to the process and need none).
+    """
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as conn:
+            conn.execute(text("SELECT pg_advisory_lock(:k)"), {"k": SCHEMA_LOCK_ID})
+            conn.commit()
+            try:
+                yield
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": SCHEMA_LOCK_ID})
+                conn.commit()
+        return
+    path = engine.url.database if engine.dialect.name == "sqlite" else None
+    try:
+        import fcntl
+    except ImportError:  # Windows dev boxes run a single worker
+        fcntl = None
+    if not path or path == ":memory:" or fcntl is None:
+        yield
+        return
+    with open(os.path.abspath(path) + ".schema-lock", "a") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def _create_all(engine: Engine):
+    from backend.database import Base
+    from backend import models  # noqa: F401  (register every table)
+    try:
+        Base.metadata.create_all(bind=engine)
+    except DatabaseError as e:
+        # a process outside schema_lock (an older build mid-deploy) created a table between
+        # checkfirst and CREATE; the second pass sees it
+        if "already exists" not in str(e):
+            raise
+        Base.metadata.create_all(bind=engine)
+
+
+def ensure_schema(engine: Engine) -> list[str] | None:
+    """create_all + upgrade() + stamp, unless the stored version is current (returns None then).
+
+    Safe to call from every worker at once: the first one through schema_lock does
+    the work, the rest find the version already stamped and return None.
+    """
+    if stored_version(engine) == SCHEMA_VERSION:
+        return None
+    with schema_lock(engine):
+        current = stored_version(engine)
+        if current == SCHEMA_VERSION:
+            return None
+        fresh = "events" not in inspect(engine).get_table_names()
+        _create_all(engine)
+        applied = upgrade(engine)
+        for version, steps in sorted(VERSION_STEPS.items()):
+            # repairs fix data written by older builds; a database created just now has none
+            if not fresh and (current is None or current < version):
+                for fn in steps:
+                    fn()
+                applied.append(f"v{version}")
+        stamp_version(engine)
+        return applied
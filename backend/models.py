@@ -1,6 +1,6 @@
 # models.py
 from sqlalchemy import (
-    Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Text, func, UniqueConstraint
+    Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Text, func, UniqueConstraint, Index
 )
 from sqlalchemy.orm import relationship, backref
 from datetime import datetime
@@ -27,7 +27,8 @@ class Organization(Base):
         "Player",
         secondary="player_organizations",
         back_populates="organizations",
-        lazy="selectin",
+        lazy="select",
+        overlaps="org_links,player,organization",
     )
 
 # ---------------------------------------------------------------------
@@ -37,10 +38,10 @@ class Player(Base):
     __tablename__ = "players"
 
     # your original PK name
-    player_id = Column(Integer, primary_key=True, index=True, nullable=True)
+    player_id = Column(Integer, primary_key=True, index=True)
 
     # original columns kept intact
-    name = Column(String, unique=False, index=True)
+    name = Column(String, unique=True, index=True)  # unique since ingest upserts on it
     org = Column(String, nullable=True, index=True)  # legacy single-org string (kept for compatibility)
     first_seen = Column(DateTime, default=datetime.utcnow)
     last_seen = Column(DateTime, default=datetime.utcnow)
@@ -48,19 +49,21 @@ class Player(Base):
     total_kills = Column(Integer, default=0)
     value_destroyed = Column(Float, default=0.0)
     score = Column(Float, default=0.0)
+    # leaderboard sort key: score + decay credit for last_seen (see services_ranking)
+    rank_key = Column(Float, nullable=True, index=True)
 
-    # events (your original relationships)
+    # events (your original relationships); loaded only on access or via selectinload()/joinedload()
     events_as_attacker = relationship(
         "Event",
         back_populates="attacker",
         foreign_keys="Event.attacker_id",
-        lazy="selectin",
+        lazy="select",
     )
     events_as_victim = relationship(
         "Event",
         back_populates="victim",
         foreign_keys="Event.victim_id",
-        lazy="selectin",
+        lazy="select",
     )
 
     # NEW: many-to-many to organizations via link table
@@ -68,13 +71,15 @@ class Player(Base):
         "PlayerOrganization",
         back_populates="player",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        lazy="select",
+        overlaps="organizations,players",
     )
     organizations = relationship(
         "Organization",
         secondary="player_organizations",
         back_populates="players",
-        lazy="selectin",
+        lazy="select",
+        overlaps="org_links,player,organization",
     )
 
 # ---------------------------------------------------------------------
@@ -98,8 +103,8 @@ class PlayerOrganization(Base):
     last_seen  = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # relationships
-    player = relationship("Player", back_populates="org_links", lazy="joined")
-    organization = relationship("Organization", lazy="joined")
+    player = relationship("Player", back_populates="org_links", lazy="select", overlaps="organizations,players")
+    organization = relationship("Organization", lazy="select", overlaps="organizations,players")
 
     __table_args__ = (
         UniqueConstraint("player_id", "org_sid", name="uq_player_org_unique"),
@@ -115,15 +120,19 @@ class Event(Base):
 
     # you originally stored ISO strings; keep that for compatibility
     timestamp = Column(String, index=True)
+    # the same instant normalized to naive UTC at ingest (timeparse.event_time); use this for ranges/ordering
+    occurred_at = Column(DateTime, nullable=True)
+    # when the server stored it; aggregates count an event at coalesce(occurred_at, received_at)
+    received_at = Column(DateTime, nullable=True)
 
     # attacker/victim FKs to players
     attacker_id = Column(Integer, ForeignKey("players.player_id"), nullable=True)
     victim_id   = Column(Integer, ForeignKey("players.player_id"), nullable=True)
 
     # denormalized names/orgs (keep — useful for quick queries & historical snapshots)
-    attacker_name = Column(String, index=True)
-    attacker_org  = Column(String, index=True, nullable=True)
-    victim_name   = Column(String, index=True)
+    attacker_name = Column(String)
+    attacker_org  = Column(String, nullable=True)
+    victim_name   = Column(String)
 
     # location & context
     zone = Column(String)
@@ -134,10 +143,120 @@ class Event(Base):
     damage_type = Column(String)
     ship_value_estimate = Column(Float, default=0.0)
 
+    # nearest known body, assigned once at ingest (see services/bodies.py)
+    body = Column(String, nullable=True, index=True)
+    body_distance = Column(Float, nullable=True)
+
+    # client-generated id of the source log line; resends of the same kill are dropped on it
+    event_key = Column(String(64), nullable=True, unique=True, index=True)
+
     # raw line + confirmation
     raw_line = Column(Text)
     confirmed = Column(Boolean, default=True)
 
     # relationships back to Player
-    attacker = relationship("Player", foreign_keys=[attacker_id], back_populates="events_as_attacker", lazy="joined")
-    victim   = relationship("Player", foreign_keys=[victim_id],   back_populates="events_as_victim",   lazy="joined")
+    attacker = relationship("Player", foreign_keys=[attacker_id], back_populates="events_as_attacker", lazy="select")
+    victim   = relationship("Player", foreign_keys=[victim_id],   back_populates="events_as_victim",   lazy="select")
+
+    # (filter, event_id) pairs for GET /events: equality filter + keyset range on one index.
+    # They also serve plain lookups on the leading column, so those columns get no index of their own.
+    __table_args__ = (
+        Index("ix_events_attacker_name_id", "attacker_name", "event_id"),
+        Index("ix_events_victim_name_id", "victim_name", "event_id"),
+        Index("ix_events_attacker_org_id", "attacker_org", "event_id"),
+        Index("ix_events_zone_id", "zone", "event_id"),
+        Index("ix_events_damage_type_id", "damage_type", "event_id"),
+        Index("ix_events_confirmed_id", "confirmed", "event_id"),
+        # time windows (search, rollup rebuilds) ordered newest-first; also covers plain occurred_at lookups
+        Index("ix_events_occurred_at_id", "occurred_at", "event_id"),
+    )
+
+
+# ---------------------------------------------------------------------
+# BODY STATS (per-body hotspot counters, maintained at ingest)
+# ---------------------------------------------------------------------
+class BodyStat(Base):
+    __tablename__ = "body_stats"
+
+    body = Column(String, primary_key=True)
+    event_count = Column(Integer, nullable=False, default=0)
+
+    # closest-to-body sample coordinate seen so far
+    sample_x = Column(Float, nullable=True)
+    sample_y = Column(Float, nullable=True)
+    sample_z = Column(Float, nullable=True)
+    sample_distance = Column(Float, nullable=True)
+
+# ---------------------------------------------------------------------
+# HOTSPOT ROLLUPS (hourly/daily event counts per body+zone)
+# ---------------------------------------------------------------------
+class HotspotRollup(Base):
+    __tablename__ = "hotspot_rollups"
+
+    id = Column(Integer, primary_key=True)
+
+    granularity  = Column(String, nullable=False)    # "hour" | "day"
+    bucket_start = Column(DateTime, nullable=False)  # UTC, truncated to the granularity
+    body = Column(String, nullable=False)
+    zone = Column(String, nullable=False, default="")
+    event_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        # also serves windowed reads: WHERE granularity = ? AND bucket_start BETWEEN ...
+        UniqueConstraint("granularity", "bucket_start", "body", "zone", name="uq_hotspot_rollup_bucket"),
+    )
+
+# ---------------------------------------------------------------------
+# STARAPI CACHE (persistent TTL cache for starcitizen-api lookups)
+# ---------------------------------------------------------------------
+class StarapiCacheEntry(Base):
+    __tablename__ = "starapi_cache"
+
+    key = Column(String, primary_key=True)           # "user:<handle>" | "org:<SID>"
+    value = Column(Text, nullable=True)              # JSON; NULL = negative result (not found)
+    fetched_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+# ---------------------------------------------------------------------
+# ENRICHMENT JOBS (org lookups queued at ingest, drained by tasks.py workers)
+# ---------------------------------------------------------------------
+class EnrichmentJob(Base):
+    __tablename__ = "enrichment_jobs"
+
+    id = Column(Integer, primary_key=True)
+    handle = Column(String, nullable=False, unique=True)   # dedup: one job per handle
+    player_id = Column(Integer, ForeignKey("players.player_id", ondelete="CASCADE"), nullable=True)
+
+    status = Column(String, nullable=False, default="pending")  # pending | running | done | failed
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    claimed_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_enrichment_jobs_due", "status", "next_attempt_at"),
+    )
+
+
+# ---------------------------------------------------------------------
+# RATE LIMITS (token buckets shared by every worker process; services/ratelimit.py)
+# ---------------------------------------------------------------------
+class RateLimit(Base):
+    __tablename__ = "rate_limits"
+
+    name = Column(String, primary_key=True)      # e.g. "starapi"
+    tokens = Column(Float, nullable=False)
+    updated_at = Column(Float, nullable=False)   # epoch seconds of the last take; doubles as a version
+
+
+# ---------------------------------------------------------------------
+# SCHEMA VERSION (one row; lets startup skip create_all/reflection when current)
+# ---------------------------------------------------------------------
+class SchemaVersion(Base):
+    __tablename__ = "schema_version"
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False)
+    applied_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,155 @@
+# backend/profiling.py
+"""Opt-in SQL profiling (SQL_PROFILE=1) built on SQLAlchemy cursor events.
+
+Per request: statement count and DB time, returned as X-DB-Queries / X-DB-Time
+headers. A statement shape repeated N_PLUS_ONE_THRESHOLD times in one request is
+recorded as a likely N+1. Statements slower than SLOW_QUERY_MS go to a ring
+buffer with their parameters. All of it is read back from /ops/queries.
+"""
+import os
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from datetime import datetime
+
+from sqlalchemy import event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+SQL_PROFILE = os.getenv("SQL_PROFILE", "0") == "1"
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+SLOW_QUERY_BUFFER = int(os.getenv("SLOW_QUERY_BUFFER", "100"))
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+MAX_SHAPES = 500
+
+slow_queries: deque = deque(maxlen=SLOW_QUERY_BUFFER)
+n_plus_one: deque = deque(maxlen=SLOW_QUERY_BUFFER)
+shape_totals: dict[str, list] = {}  # shape -> [count, total seconds]
+_lock = threading.Lock()
+
+
+class RequestProfile:
+    __slots__ = ("route", "queries", "seconds", "shapes")
+
+    def __init__(self, route: str):
+        self.route = route
+        self.queries = 0
+        self.seconds = 0.0
+        self.shapes: Counter = Counter()
+
+
+_current: ContextVar[RequestProfile | None] = ContextVar("sql_profile", default=None)
+
+_IN_LIST = re.compile(r"\((?:\s*(?:\?|%\(\w+\)s|%s|:\w+)\s*,)+\s*(?:\?|%\(\w+\)s|%s|:\w+)\s*\)")
+_WS = re.compile(r"\s+")
+
+
+def shape(statement: str) -> str:
+    """Statement with whitespace folded and expanded IN (...) lists collapsed."""
+    return _IN_LIST.sub("(?)", _WS.sub(" ", statement).strip())
+
+
+def _params_repr(parameters, limit: int = 500) -> str:
+    text = repr(parameters)
+    return text if len(text) <= limit else text[:limit] + "…"
+
+
+def _before(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    s = shape(statement)
+    prof = _current.get()
+    if prof is not None:
+        prof.queries += 1
+        prof.seconds += elapsed
+        if not executemany:  # one logical batch (SQLite runs insertmanyvalues row by row) is not an N+1
+            prof.shapes[s] += 1
+    with _lock:
+        tot = shape_totals.get(s)
+        if tot is None and len(shape_totals) < MAX_SHAPES:
+            tot = shape_totals[s] = [0, 0.0]
+        if tot is not None:
+            tot[0] += 1
+            tot[1] += elapsed
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        slow_queries.append({
+            "at": datetime.utcnow().isoformat(timespec="seconds"),
+            "ms": round(elapsed * 1000, 2),
+            "route": prof.route if prof else None,
+            "statement": s,
+            "parameters": _params_repr(parameters),
+            "executemany": executemany,
+        })
+
+
+def install(*engines) -> bool:
+    """Attach the cursor hooks to each (sync) engine when SQL_PROFILE=1."""
+    if not SQL_PROFILE:
+        return False
+    for eng in engines:
+        if eng is not None and not event.contains(eng, "before_cursor_execute", _before):
+            event.listen(eng, "before_cursor_execute", _before)
+            event.listen(eng, "after_cursor_execute", _after)
+    return True
+
+
+def _finish(prof: RequestProfile):
+    for s, n in prof.shapes.items():
+        if n >= N_PLUS_ONE_THRESHOLD:
+            n_plus_one.append({
+                "at": datetime.utcnow().isoformat(timespec="seconds"),
+                "route": prof.route,
+                "count": n,
+                "statement": s,
+            })
+            print(f"[sql] possible N+1 on {prof.route}: {n}x {s[:120]}")
+
+
+class QueryProfileMiddleware:
+    """Scope a RequestProfile to each HTTP request and report it in response headers."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not SQL_PROFILE:
+            return await self.app(scope, receive, send)
+        prof = RequestProfile(f'{scope["method"]} {scope["path"]}')
+        token = _current.set(prof)
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                route = scope.get("route")
+                if route is not None:
+                    prof.route = f'{scope["method"]} {route.path}'
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-queries", str(prof.queries).encode()))
+                headers.append((b"x-db-time", f"{prof.seconds * 1000:.2f}ms".encode()))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            _finish(prof)
+
+
+def report(top: int = 20) -> dict:
+    with _lock:
+        shapes = sorted(shape_totals.items(), key=lambda kv: kv[1][1], reverse=True)[:top]
+    return {
+        "enabled": SQL_PROFILE,
+        "slow_query_ms": SLOW_QUERY_MS,
+        "n_plus_one_threshold": N_PLUS_ONE_THRESHOLD,
+        "top_statements": [
+            {"statement": s, "count": n, "total_ms": round(t * 1000, 2), "avg_ms": round(t * 1000 / n, 3)}
+            for s, (n, t) in shapes
+        ],
+        "slow": list(reversed(slow_queries)),
+        "n_plus_one": list(reversed(n_plus_one)),
+    }
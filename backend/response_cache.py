@@ -0,0 +1,121 @@
+# backend/response_cache.py
+"""Versioned in-memory cache for read endpoints, with ETag / If-None-Match support.
+
+Every committed session that wrote something bumps `data_version`, so a cached
+response is reused only while nothing has changed since it was built. The
+version is per process; RESPONSE_CACHE_TTL bounds how stale an entry can get
+when another worker process wrote (and lets decayed scores move on).
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from backend.cache import LRUCache
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "512"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "30"))
+
+responses = LRUCache(RESPONSE_CACHE_SIZE)
+stats = {"not_modified": 0}
+
+_version = 0
+_version_lock = threading.Lock()
+
+
+def data_version() -> int:
+    return _version
+
+
+def bump_version() -> int:
+    global _version
+    with _version_lock:
+        _version += 1
+        return _version
+
+
+# --- write tracking: any flush or DML statement marks the session, its commit bumps the version ---
+@event.listens_for(Session, "after_flush")
+def _mark_flush(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_dml(state):
+    if state.is_insert or state.is_update or state.is_delete:
+        state.session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_on_commit(session):
+    if session.info.pop("wrote", False):
+        bump_version()
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_on_rollback(session):
+    session.info.pop("wrote", None)
+
+
+def _etag(body: bytes) -> str:
+    # content hash, so identical payloads from different workers share a tag
+    return '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+
+
+def _matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = {t.strip().removeprefix("W/") for t in header.split(",")}
+    return etag in tags or "*" in tags
+
+
+def _reply(request: Request, body: bytes, etag: str) -> Response:
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _matches(request, etag):
+        stats["not_modified"] += 1
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def cached_json(request: Request, build: Callable[[], Awaitable[Any]]) -> Response:
+    """Serve `await build()` as JSON, cached under (path, query, data_version)."""
+    key = (request.url.path, tuple(sorted(request.query_params.multi_items())))
+    version = data_version()
+    now = time.monotonic()
+    hit = responses.get(key)
+    if hit is not None and hit[0] == version and hit[1] > now:
+        return _reply(request, hit[2], hit[3])
+
+    body, etag = _store(key, version, await build())
+    return _reply(request, body, etag)
+
+
+def _store(key, version: int, data) -> tuple[bytes, str]:
+    body = json.dumps(jsonable_encoder(data), separators=(",", ":")).encode()
+    etag = _etag(body)
+    responses.set(key, (version, time.monotonic() + RESPONSE_CACHE_TTL, body, etag))
+    return body, etag
+
+
+def prime(path: str, build: Callable[[], Any], **query) -> None:
+    """Fill the entry a GET of `path` with these query params would use (startup warm-up)."""
+    version = data_version()
+    _store((path, tuple(sorted((k, str(v)) for k, v in query.items()))), version, build())
+
+
+def cache_stats() -> dict:
+    return {
+        "version": data_version(),
+        "entries": len(responses),
+        "hits": responses.hits,
+        "misses": responses.misses,
+        "not_modified": stats["not_modified"],
+    }
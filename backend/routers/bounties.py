@@ -1,14 +1,26 @@
-from fastapi import APIRouter, Depends
+from datetime import datetime
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.orm import Session
-from backend.database import get_db
+from backend.database import get_session, run_db
 from backend.models import Player
 from backend.schemas import PirateProfile
-from backend.services_ranking import recompute_scores
+from backend.response_cache import cached_json
+import backend.crud as crud
 
 router = APIRouter(tags=["bounties"])
 
+def _bounties(db: Session, limit: int) -> list[PirateProfile]:
+    # rank_key is maintained at ingest and indexed, so this is a top-K index scan with no writes
+    now = datetime.utcnow()
+    q = (
+        crud.profile_query(db)
+        .filter(Player.rank_key.isnot(None))
+        .order_by(Player.rank_key.desc())
+        .limit(limit)
+        .all()
+    )
+    return [crud.to_profile(p, now) for p in q]
+
 @router.get("/bounties", response_model=list[PirateProfile])
-def get_bounties(db: Session = Depends(get_db), limit: int = 25):
-    recompute_scores(db)
-    q = db.query(Player).order_by(Player.score.desc()).limit(limit).all()
-    return [PirateProfile(player_id=p.player_id or 0, name=p.name, org=p.org, total_attacks=p.total_attacks, total_kills=p.total_kills, value_destroyed=p.value_destroyed, score=p.score) for p in q]
+async def get_bounties(request: Request, db=Depends(get_session), limit: int = 25):
+    return await cached_json(request, lambda: run_db(db, _bounties, limit))
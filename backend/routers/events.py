@@ -1,72 +1,251 @@
 # backend/routers/events.py
-from fastapi import APIRouter, Depends, HTTPException, Path, BackgroundTasks
+import asyncio
+from typing import Any, Optional, Union
+from datetime import datetime
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Path, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
 
-from backend.database import get_db
+from backend import metrics
+from backend.broadcast import broadcaster
+from backend.database import get_session, run_db
 from backend.models import Event
-from backend.schemas import EventCreate, EventOut
+from backend.schemas import EventCreate, EventOut, EventBatchItem, EventBatchOut, EventPage
+from backend.timeparse import parse_ts
 from backend.deps import require_client_api_key, require_admin_api_key
 import backend.crud as crud
 
-try:
-    from backend.tasks import enrich_attacker_org
-except Exception:
-    def enrich_attacker_org(*args, **kwargs): return None
-
 router = APIRouter(tags=["events"])
 
+MAX_BATCH = 500
+STREAM_HEARTBEAT = 15.0  # seconds between SSE keep-alive comments
+STREAM_REPLAY_LIMIT = 500
+MAX_PAGE = 500
+
+def search_events(db: Session, filters: dict, since: Optional[datetime], until: Optional[datetime],
+                  cursor: Union[int, str, None], limit: int) -> EventPage:
+    """Newest-first keyset page.
+
+    With an equality filter: WHERE <filters> AND event_id < cursor ORDER BY event_id DESC,
+    on that filter's (column, event_id) index. A time window alone is ordered by
+    (occurred_at, event_id) on the matching index, with the cursor holding both, so a
+    wide window is a range read rather than a sort. Either way a page reads `limit`
+    rows however deep the cursor is. `cursor` is a previous page's next_cursor."""
+    cursor = _cursor(cursor)
+    q = db.query(Event)
+    for col, value in filters.items():
+        if value is not None:
+            q = q.filter(getattr(Event, col) == value)
+    if since is not None:
+        q = q.filter(Event.occurred_at >= since)
+    if until is not None:
+        q = q.filter(Event.occurred_at < until)
+    by_time = (since is not None or until is not None) and all(v is None for v in filters.values())
+    if by_time:
+        if cursor is not None:
+            if not isinstance(cursor, tuple):
+                raise HTTPException(status_code=422, detail="Cursor is from a different query")
+            q = q.filter(tuple_(Event.occurred_at, Event.event_id) < cursor)
+        q = q.order_by(Event.occurred_at.desc(), Event.event_id.desc())
+    else:
+        if cursor is not None:
+            if isinstance(cursor, tuple):
+                raise HTTPException(status_code=422, detail="Cursor is from a different query")
+            q = q.filter(Event.event_id < cursor)
+        q = q.order_by(Event.event_id.desc())
+    rows = q.limit(limit + 1).all()
+    items = [EventOut.model_validate(ev) for ev in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = f"{last.occurred_at.isoformat()}_{last.event_id}" if by_time else last.event_id
+    return EventPage(items=items, next_cursor=next_cursor)
+
+def _cursor(value: Union[int, str, None]) -> Union[int, tuple[datetime, int], None]:
+    """next_cursor as sent back: an event_id, or '<occurred_at>_<event_id>' for time-window pages."""
+    if value is None or isinstance(value, int):
+        return value
+    try:
+        if value.isdigit():
+            return int(value)
+        at, _, eid = value.rpartition("_")
+        return datetime.fromisoformat(at), int(eid)
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Malformed cursor")
+
+def _time_bound(value: Optional[str], name: str) -> Optional[datetime]:
+    if value is None:
+        return None
+    dt = parse_ts(value)
+    if dt is None:
+        raise HTTPException(status_code=422, detail=f"Unrecognised '{name}' timestamp")
+    return dt
+
+@router.get("/events", response_model=EventPage)
+async def list_events(
+    attacker: Optional[str] = None,
+    victim: Optional[str] = None,
+    org: Optional[str] = Query(None, description="Attacker org"),
+    zone: Optional[str] = None,
+    damage_type: Optional[str] = None,
+    confirmed: Optional[bool] = None,
+    since: Optional[str] = Query(None, description="ISO timestamp (UTC), inclusive"),
+    until: Optional[str] = Query(None, description="ISO timestamp (UTC), exclusive"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=MAX_PAGE),
+    db=Depends(get_session),
+):
+    filters = {"attacker_name": attacker, "victim_name": victim, "attacker_org": org,
+               "zone": zone, "damage_type": damage_type, "confirmed": confirmed}
+    return await run_db(db, search_events, filters, _time_bound(since, "since"), _time_bound(until, "until"),
+                        cursor, limit)
+
+def _ingest_one(db: Session, payload: EventCreate) -> tuple[EventOut, bool]:
+    # one transaction: event row, player counters and aggregates commit (or roll back) together
+    try:
+        events, duplicates = crud.ingest_events(db, [payload])
+        out = EventOut.model_validate(events[0])  # before commit, so nothing is re-read afterwards
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return out, bool(duplicates)
+
 @router.post(
     "/events",
     response_model=EventOut,
     dependencies=[Depends(require_client_api_key)],
 )
-def post_event(
-    payload: EventCreate,
-    background_tasks: BackgroundTasks,          # non-default first
-    db: Session = Depends(get_db),              # default (Depends) after
-):
-    attacker = crud.get_or_create_player_by_name(db, payload.attacker_name)
-    victim   = crud.get_or_create_player_by_name(db, payload.victim_name)
-
-    ev = Event(
-        timestamp=payload.timestamp,
-        attacker_id=attacker.player_id if attacker else None,
-        victim_id=victim.player_id if victim else None,
-        attacker_name=payload.attacker_name,
-        attacker_org=payload.attacker_org,
-        victim_name=payload.victim_name,
-        zone=payload.zone,
-        x=(payload.coords.x if payload.coords else None),
-        y=(payload.coords.y if payload.coords else None),
-        z=(payload.coords.z if payload.coords else None),
-        weapon=payload.weapon,
-        damage_type=payload.damage_type,
-        ship_value_estimate=payload.ship_value_estimate or 0.0,
-        raw_line=payload.source_line,
-        confirmed=True,
-    )
-    db.add(ev)
-    db.commit()
-    db.refresh(ev)
+async def post_event(payload: EventCreate, db=Depends(get_session)):
+    # org enrichment is queued inside the same transaction; tasks.py workers pick it up
+    out, duplicate = await run_db(db, _ingest_one, payload)
+    if not duplicate:  # a resend of a stored event_key answers with the stored row
+        metrics.inc("events_ingested_total", route="single")
+        broadcaster.publish([out])
+    return out
+
+
+def _ingest_many(db: Session, payloads: list[EventCreate], want_out: bool = False):
+    """Returns (event_ids, duplicate indexes, EventOut list of new events or None).
 
+    The models are only built when someone is streaming."""
     try:
-        crud.update_player_stats(db, attacker, victim, ev)
+        events, duplicates = crud.ingest_events(db, payloads)
+        event_ids = [ev.event_id for ev in events]
+        outs = ([EventOut.model_validate(ev) for i, ev in enumerate(events) if i not in duplicates]
+                if want_out else None)
         db.commit()
     except Exception:
         db.rollback()
+        raise HTTPException(status_code=500, detail="Batch insert failed")
+    return event_ids, duplicates, outs
 
-    if not payload.attacker_org and payload.attacker_name:
-        background_tasks.add_task(enrich_attacker_org, payload.attacker_name, None)
+@router.post(
+    "/events/batch",
+    response_model=EventBatchOut,
+    dependencies=[Depends(require_client_api_key)],
+)
+async def post_events_batch(
+    items: list[dict[str, Any]] = Body(...),
+    db=Depends(get_session),
+):
+    """Ingest many events in one transaction; invalid items are reported per index, not fatal."""
+    if len(items) > MAX_BATCH:
+        raise HTTPException(status_code=413, detail=f"Batch too large (max {MAX_BATCH})")
 
-    return ev
+    results: list[EventBatchItem] = []
+    valid: list[tuple[int, EventCreate]] = []
+    for i, raw in enumerate(items):
+        try:
+            valid.append((i, EventCreate.model_validate(raw)))
+        except ValidationError as e:
+            err = e.errors()[0]
+            loc = ".".join(str(part) for part in err.get("loc", ()))
+            results.append(EventBatchItem(index=i, error=f"{loc}: {err.get('msg', 'invalid')}" if loc else err.get("msg", "invalid")))
 
+    if valid:
+        event_ids, duplicates, outs = await run_db(db, _ingest_many, [p for _, p in valid], bool(broadcaster))
+        metrics.inc("events_ingested_total", len(event_ids) - len(duplicates), route="batch")
+        if outs:
+            broadcaster.publish(outs)
+        for j, ((i, _), event_id) in enumerate(zip(valid, event_ids)):
+            results.append(EventBatchItem(index=i, event_id=event_id, duplicate=j in duplicates))
 
-@router.post("/events/{event_id}/confirm", response_model=EventOut, dependencies=[Depends(require_admin_api_key)])
-def confirm_event(event_id: int = Path(...), db: Session = Depends(get_db)):
+    results.sort(key=lambda r: r.index)
+    inserted = sum(1 for r in results if r.event_id is not None and not r.duplicate)
+    failed = sum(1 for r in results if r.error is not None)
+    return EventBatchOut(inserted=inserted, failed=failed, duplicates=len(results) - inserted - failed,
+                         results=results)
+
+
+def _confirm(db: Session, event_id: int) -> EventOut:
     ev = db.query(Event).filter(Event.event_id == event_id).first()
     if not ev:
         raise HTTPException(status_code=404, detail="Event not found")
-    ev.confirmed = True
+    if not ev.confirmed:
+        ev.confirmed = True
+        crud.record_aggregates(db, [ev])
     db.add(ev)
+    out = EventOut.model_validate(ev)
     db.commit()
-    return ev
\ No newline at end of file
+    return out
+
+@router.post("/events/{event_id}/confirm", response_model=EventOut, dependencies=[Depends(require_admin_api_key)])
+async def confirm_event(event_id: int = Path(...), db=Depends(get_session)):
+    return await run_db(db, _confirm, event_id)
+
+
+def _events_after(db: Session, last_id: int) -> list[EventOut]:
+    rows = (db.query(Event).filter(Event.event_id > last_id)
+            .order_by(Event.event_id).limit(STREAM_REPLAY_LIMIT).all())
+    return [EventOut.model_validate(ev) for ev in rows]
+
+def _sse(ev: EventOut) -> str:
+    return f"id: {ev.event_id}\nevent: kill\ndata: {ev.model_dump_json()}\n\n"
+
+@router.get("/events/stream", dependencies=[Depends(require_client_api_key)])
+async def stream_events(
+    request: Request,
+    last_event_id: Optional[int] = Header(None),
+    db=Depends(get_session),
+):
+    """Server-Sent Events feed of newly ingested events (client API key required).
+
+    Reconnecting clients send Last-Event-ID and get what they missed (up to
+    STREAM_REPLAY_LIMIT events) before live events resume."""
+    sub = broadcaster.subscribe()
+    if sub is None:
+        raise HTTPException(status_code=503, detail="Too many stream subscribers")
+    try:
+        backlog = await run_db(db, _events_after, last_event_id) if last_event_id is not None else []
+    except Exception:
+        broadcaster.unsubscribe(sub)
+        raise
+
+    async def gen():
+        # ids sent from the backlog, so the same rows published live are not sent twice; not a
+        # high-water mark, since concurrent commits can publish a lower id after a higher one
+        replayed = {ev.event_id for ev in backlog}
+        try:
+            yield "retry: 5000\n\n"
+            for ev in backlog:
+                yield _sse(ev)
+            while not await request.is_disconnected():
+                try:
+                    ev = await asyncio.wait_for(sub.queue.get(), STREAM_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                if ev is None:  # dropped as a slow consumer; client reconnects with Last-Event-ID
+                    break
+                if ev.event_id in replayed:
+                    replayed.discard(ev.event_id)
+                    continue
+                yield _sse(ev)
+        finally:
+            broadcaster.unsubscribe(sub)
+
+    return StreamingResponse(gen(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
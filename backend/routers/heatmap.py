@@ -1,43 +1,66 @@
-from fastapi import APIRouter, Depends
+from datetime import datetime, timedelta
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from backend.database import get_db
-from backend.models import Event
-from math import sqrt
-from collections import Counter
+from backend.database import get_session, run_db
+from backend.models import BodyStat, HotspotRollup
+from backend.response_cache import cached_json
+from backend.timeparse import parse_ts
 router = APIRouter(tags=['heatmap'])
 
-# Replace these with real coordinates for accuracy
-BODIES = {
-    'Crusader': (0.0, 0.0, 0.0),
-    'Daymar': (10000.0, 5000.0, 0.0),
-    'Yela': (-8000.0, -3000.0, 2000.0),
-    'Cellin': (4000.0, -7000.0, -1000.0),
-    'MicroTech': (20000.0, 10000.0, 0.0),
-    'Bennu': (-15000.0, 12000.0, 3000.0),
-}
-
-def _nearest_body(x: float, y: float, z: float):
-    best = None
-    best_dist = None
-    for name, (bx, by, bz) in BODIES.items():
-        d = ((x-bx)**2 + (y-by)**2 + (z-bz)**2) ** 0.5
-        if best_dist is None or d < best_dist:
-            best = name
-            best_dist = d
-    return best, best_dist
+def _window_bound(value: Optional[str], name: str) -> Optional[datetime]:
+    if value is None:
+        return None
+    dt = parse_ts(value)
+    if dt is None:
+        raise HTTPException(status_code=422, detail=f"Unrecognised '{name}' timestamp")
+    return dt
 
 @router.get('/heatmap')
-def heatmap(db: Session = Depends(get_db)):
-    events = db.query(Event).filter(Event.confirmed == True).all()
-    counts = Counter()
-    nearest_samples = {}
-    for e in events:
-        if e.x is None or e.y is None or e.z is None:
-            continue
-        body, dist = _nearest_body(e.x, e.y, e.z)
-        counts[body] += 1
-        if body not in nearest_samples or dist < nearest_samples[body][1]:
-            nearest_samples[body] = ((e.x, e.y, e.z), dist)
-    summary = [{'body': b, 'count': counts[b], 'sample_coord': nearest_samples.get(b, (None, None))[0]} for b in counts]
+async def heatmap(
+    request: Request,
+    since: Optional[str] = Query(None, description="ISO timestamp (UTC); enables windowed mode"),
+    until: Optional[str] = Query(None, description="ISO timestamp (UTC), exclusive"),
+    bucket: Optional[Literal['hour', 'day']] = Query(None, description="Also return a per-bucket trend series"),
+    zone: Optional[str] = Query(None, description="Restrict windowed counts to one zone"),
+    db=Depends(get_session),
+):
+    start = _window_bound(since, 'since')
+    end = _window_bound(until, 'until')
+    return await cached_json(request, lambda: run_db(db, _heatmap, start, end, bucket, zone))
+
+def _heatmap(db: Session, start: Optional[datetime], end: Optional[datetime],
+             bucket: Optional[str], zone: Optional[str]) -> dict:
+    samples = {r.body: r for r in db.query(BodyStat).filter(BodyStat.event_count > 0).all()}
+
+    def _sample(body):
+        r = samples.get(body)
+        return (r.sample_x, r.sample_y, r.sample_z) if r is not None and r.sample_distance is not None else None
+
+    if start is None and end is None and bucket is None and zone is None:
+        # all-time: per-body counters are maintained at ingest; one row per body
+        rows = sorted(samples.values(), key=lambda r: r.event_count, reverse=True)
+        return {'hotspots': [{'body': r.body, 'count': r.event_count, 'sample_coord': _sample(r.body)} for r in rows]}
+
+    # windowed: read pre-aggregated buckets instead of scanning events
+    granularity = bucket or ('hour' if start is not None and (end or datetime.utcnow()) - start <= timedelta(days=2) else 'day')
+    q = db.query(HotspotRollup.bucket_start, HotspotRollup.body, func.sum(HotspotRollup.event_count).label('count')) \
+        .filter(HotspotRollup.granularity == granularity)
+    if start is not None:
+        q = q.filter(HotspotRollup.bucket_start >= start)
+    if end is not None:
+        q = q.filter(HotspotRollup.bucket_start < end)
+    if zone is not None:
+        q = q.filter(HotspotRollup.zone == zone)
+    rows = q.group_by(HotspotRollup.bucket_start, HotspotRollup.body).order_by(HotspotRollup.bucket_start).all()
+
+    totals: dict[str, int] = {}
+    for r in rows:
+        totals[r.body] = totals.get(r.body, 0) + r.count
+    summary = [{'body': b, 'count': n, 'sample_coord': _sample(b)} for b, n in totals.items()]
     summary = sorted(summary, key=lambda x: x['count'], reverse=True)
-    return {'hotspots': summary}
+    out = {'hotspots': summary, 'since': start, 'until': end, 'granularity': granularity}
+    if bucket is not None:
+        out['trend'] = [{'bucket_start': r.bucket_start, 'body': r.body, 'count': r.count} for r in rows]
+    return out
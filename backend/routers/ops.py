@@ -1,27 +1,94 @@
 # backend/routers/ops.py
-from fastapi import APIRouter
+import time
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
 from sqlalchemy import inspect, text
-from backend.database import engine, Base
-from backend import models  # ensure models are registered
+from backend.database import DATABASE_URL, SessionLocal, async_engine, engine, Base
+from backend import metrics, models  # ensure models are registered
+from backend import db_profiles, profiling, response_cache, startup, tasks
+from backend.deps import require_admin_api_key
+from backend.broadcast import broadcaster
+from backend.migrations import schema_lock, stamp_version, upgrade
+from backend.services import starapi_cache
+import backend.crud as crud
 
 router = APIRouter(prefix="/ops", tags=["ops"])
 
 @router.get("/healthz")
 def healthz():
+    # answers during cold start without touching the (possibly still sleeping) database
+    if not startup.state.ready:
+        return {"ok": True, "ready": False, "startup": startup.state.report()}
     try:
         with engine.connect() as conn:
             conn.execute(text("SELECT 1"))
-        return {"ok": True}
+        return {"ok": True, "ready": True, "startup": startup.state.report()}
     except Exception as e:
         return {"ok": False, "error": str(e)}
 
 @router.get("/dbz")
 def dbz():
     insp = inspect(engine)
-    return {"tables": insp.get_table_names()}
+    return {"tables": insp.get_table_names(), "engine": db_profiles.describe(DATABASE_URL)}
 
 @router.post("/init-db")
 def init_db():
-    Base.metadata.create_all(bind=engine)
+    with schema_lock(engine):
+        Base.metadata.create_all(bind=engine)
+        applied = upgrade(engine)
+        stamp_version(engine)
     insp = inspect(engine)
-    return {"initialized": True, "tables": insp.get_table_names()}
\ No newline at end of file
+    return {"initialized": True, "tables": insp.get_table_names(), "upgraded": applied}
+
+def _pool_gauges() -> list[tuple[str, dict, float]]:
+    out = []
+    for label, eng in (("sync", engine), ("async", async_engine)):
+        pool = getattr(eng, "pool", None)
+        if pool is None:
+            continue
+        for stat in ("size", "checkedout", "overflow", "checkedin"):
+            fn = getattr(pool, stat, None)
+            if callable(fn):
+                out.append((stat, {"engine": label}, max(fn(), 0)))  # overflow is negative while under pool size
+    return out
+
+def _ratio(hits, misses):
+    total = (hits or 0) + (misses or 0)
+    return hits / total if total else None
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    """Prometheus text format; counters/histograms from the request path plus point-in-time gauges."""
+    depth = {}
+    try:
+        with SessionLocal() as db:
+            depth = tasks.queue_depth(db)
+    except Exception:
+        pass
+    rc = response_cache.cache_stats()
+    sa = starapi_cache.cache_stats()
+    gauges = {
+        "process_uptime_seconds": [({}, time.time() - metrics.started_at)],
+        "startup_phase_seconds": [({"phase": p}, ms / 1000) for p, ms in startup.state.timings.items()],
+        "enrichment_queue_jobs": [({"status": s}, depth.get(s, 0)) for s in ("pending", "running", "done", "failed")],
+        "enrichment_jobs_total": [({"result": k}, v) for k, v in tasks.stats.items()],
+        "db_pool_connections": [({"engine": lbl["engine"], "state": stat}, v) for stat, lbl, v in _pool_gauges()],
+        "cache_hit_ratio": [
+            ({"cache": "player_ids"}, _ratio(crud.player_ids.hits, crud.player_ids.misses)),
+            ({"cache": "responses"}, _ratio(rc["hits"], rc["misses"])),
+            ({"cache": "starapi"}, sa.get("hit_ratio")),
+        ],
+        "cache_entries": [
+            ({"cache": "player_ids"}, len(crud.player_ids)),
+            ({"cache": "responses"}, rc["entries"]),
+            ({"cache": "starapi"}, sa.get("memory_entries")),
+        ],
+        "stream_subscribers": [({}, len(broadcaster.subscribers))],
+        "stream_dropped_subscribers_total": [({}, broadcaster.stats["dropped_subscribers"])],
+    }
+    return PlainTextResponse(metrics.render(gauges), media_type="text/plain; version=0.0.4")
+
+@router.get("/queries", dependencies=[Depends(require_admin_api_key)])
+def queries(top: int = 20):
+    """SQL profile (SQL_PROFILE=1): heaviest statement shapes, slow-query ring buffer, N+1 suspects."""
+    return profiling.report(top)
@@ -1,20 +1,23 @@
+from typing import Literal, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from backend.database import get_db
+from backend.database import get_session, run_db
 from backend.models import Player
 from backend.schemas import PirateProfile
+import backend.crud as crud
 router = APIRouter(tags=['players'])
 
-@router.get('/pirates/by-name', response_model=PirateProfile)
-def get_pirate_by_name(name: str = Query(...), db: Session = Depends(get_db)):
-    p = db.query(Player).filter(Player.name == name).first()
-    if not p:
+def _profile(db: Session, where, include: Optional[str]) -> PirateProfile:
+    row = crud.profile_query(db).filter(where).first()
+    if not row:
         raise HTTPException(status_code=404, detail='Not found')
-    return PirateProfile(player_id=p.player_id or 0, name=p.name, org=p.org, total_attacks=p.total_attacks, total_kills=p.total_kills, value_destroyed=p.value_destroyed, score=p.score)
-    
+    orgs = crud.player_org_sids(db, row.player_id) if include == 'orgs' else None
+    return crud.to_profile(row, organizations=orgs)
+
+@router.get('/pirates/by-name', response_model=PirateProfile)
+async def get_pirate_by_name(name: str = Query(...), include: Optional[Literal['orgs']] = None, db=Depends(get_session)):
+    return await run_db(db, _profile, Player.name == name, include)
+
 @router.get('/pirates/{player_id}', response_model=PirateProfile)
-def get_pirate(player_id: int, db: Session = Depends(get_db)):
-    p = db.query(Player).filter(Player.player_id == player_id).first()
-    if not p:
-        raise HTTPException(status_code=404, detail='Not found')
-    return PirateProfile(player_id=p.player_id or 0, name=p.name, org=p.org, total_attacks=p.total_attacks, total_kills=p.total_kills, value_destroyed=p.value_destroyed, score=p.score)
+async def get_pirate(player_id: int, include: Optional[Literal['orgs']] = None, db=Depends(get_session)):
+    return await run_db(db, _profile, Player.player_id == player_id, include)
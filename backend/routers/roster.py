@@ -1,19 +1,26 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.orm import Session
-from backend.database import get_db
+from backend.database import get_session, run_db
 from backend.models import Player
+from backend.response_cache import cached_json
 import os
 from dotenv import load_dotenv
 load_dotenv()
 router = APIRouter(tags=['roster'])
 
+def _org_member_names(db: Session, org_name: str) -> list[str]:
+    return [n for (n,) in db.query(Player.name).filter(Player.org == org_name)]
+
 @router.get('/roster')
-def get_roster(db: Session = Depends(get_db)):
+async def get_roster(request: Request, db=Depends(get_session)):
+    return await cached_json(request, lambda: _roster(db))
+
+async def _roster(db) -> dict:
     ORG_NAME = os.getenv('ORG_NAME','').strip()
     if ORG_NAME:
-        players = db.query(Player).filter(Player.org == ORG_NAME).all()
-        if players:
-            return {'roster':[p.name for p in players]}
+        names = await run_db(db, _org_member_names, ORG_NAME)
+        if names:
+            return {'roster': names}
     roster_env = os.getenv('ROSTER_MEMBERS','')
     if roster_env:
         roster = [s.strip() for s in roster_env.split(',') if s.strip()]
@@ -1,6 +1,7 @@
 # backend/schemas.py
 from pydantic import BaseModel, Field
-from typing import Optional
+from datetime import datetime
+from typing import Optional, Union
 
 class Coord3D(BaseModel):
     x: float
@@ -20,10 +21,12 @@ class EventCreate(BaseModel):
     damage_type: str
     ship_value_estimate: float = 0.0
     source_line: Optional[str] = Field(default=None)   # maps to Event.raw_line
+    event_key: Optional[str] = Field(default=None, max_length=64)  # idempotency key; resends are not re-counted
 
 class EventOut(BaseModel):
     event_id: int
     timestamp: str
+    occurred_at: Optional[datetime] = None
     attacker_id: Optional[int]
     victim_id: Optional[int]
     attacker_name: str
@@ -51,3 +54,21 @@ class PirateProfile(BaseModel):
     total_kills: int
     value_destroyed: float
     score: float
+    organizations: Optional[list[str]] = None   # only filled when requested (?include=orgs)
+
+
+class EventBatchItem(BaseModel):
+    index: int
+    event_id: Optional[int] = None
+    duplicate: bool = False   # event_key already stored; event_id is the existing row
+    error: Optional[str] = None
+
+class EventBatchOut(BaseModel):
+    inserted: int
+    failed: int
+    duplicates: int = 0
+    results: list[EventBatchItem]
+
+class EventPage(BaseModel):
+    items: list[EventOut]
+    next_cursor: Optional[Union[int, str]] = None   # pass as ?cursor= for the next (older) page
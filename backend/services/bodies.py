@@ -0,0 +1,23 @@
+# backend/services/bodies.py
+# Replace these with real coordinates for accuracy
+BODIES = {
+    'Crusader': (0.0, 0.0, 0.0),
+    'Daymar': (10000.0, 5000.0, 0.0),
+    'Yela': (-8000.0, -3000.0, 2000.0),
+    'Cellin': (4000.0, -7000.0, -1000.0),
+    'MicroTech': (20000.0, 10000.0, 0.0),
+    'Bennu': (-15000.0, 12000.0, 3000.0),
+}
+
+def nearest_body(x: float | None, y: float | None, z: float | None):
+    """Return (body, distance) for the closest known body, or (None, None) without coords."""
+    if x is None or y is None or z is None:
+        return None, None
+    best = None
+    best_dist = None
+    for name, (bx, by, bz) in BODIES.items():
+        d = ((x-bx)**2 + (y-by)**2 + (z-bz)**2) ** 0.5
+        if best_dist is None or d < best_dist:
+            best = name
+            best_dist = d
+    return best, best_dist
@@ -0,0 +1,67 @@
+# backend/services/ratelimit.py
+import time
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import OperationalError
+
+
+class SharedTokenBucket:
+    """Blocking token bucket (`rate` tokens/sec refilled up to `burst`) kept in the
+    rate_limits table, so all worker processes share one budget.
+
+    Each take reads the row, refills it from the elapsed wall-clock time and writes it
+    back with a compare-and-swap on updated_at; a lost race just re-reads. One short
+    transaction per upstream call, which is far below the rates this guards.
+    """
+
+    def __init__(self, name: str, rate: float, burst: float, engine=None):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self._engine = engine
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            from backend.database import engine
+            self._engine = engine
+        return self._engine
+
+    def _try_take(self, tokens: float) -> float | None:
+        """Seconds to wait before tokens are available; 0 once taken, None after a lost race."""
+        from backend.models import RateLimit
+        t = RateLimit.__table__
+        now = time.time()
+        with self.engine.begin() as conn:
+            row = conn.execute(select(t.c.tokens, t.c.updated_at).where(t.c.name == self.name)).first()
+            if row is None:
+                if conn.dialect.name == "postgresql":
+                    from sqlalchemy.dialects.postgresql import insert
+                else:
+                    from sqlalchemy.dialects.sqlite import insert
+                stmt = insert(t).values(name=self.name, tokens=self.burst - tokens, updated_at=now)
+                return 0.0 if conn.execute(stmt.on_conflict_do_nothing()).rowcount == 1 else None
+            available = min(self.burst, row.tokens + max(0.0, now - row.updated_at) * self.rate)
+            if available < tokens:
+                return (tokens - available) / self.rate
+            n = conn.execute(
+                update(t).where(t.c.name == self.name, t.c.updated_at == row.updated_at)
+                .values(tokens=available - tokens, updated_at=now)
+            ).rowcount
+            return 0.0 if n == 1 else None
+
+    def acquire(self, tokens: float = 1.0):
+        """Block until `tokens` are taken from the shared budget."""
+        if self.rate <= 0:
+            return
+        while True:
+            try:
+                wait = self._try_take(tokens)
+            except OperationalError as e:
+                if "locked" not in str(e):  # SQLite writer contention is a lost race; anything else is real
+                    raise
+                wait = None
+            if wait == 0.0:
+                return
+            if wait is not None:
+                time.sleep(wait)
@@ -1,19 +1,37 @@
-import os, requests
+import os
+from backend.services.ratelimit import SharedTokenBucket
 
-BASE = "https://api.starcitizen-api.com"
+BASE = os.getenv("STARAPI_BASE", "https://api.starcitizen-api.com").rstrip("/")
 STARAPI_KEY = os.getenv("STARAPI_KEY", "")
 STARAPI_MODE = os.getenv("STARAPI_MODE", "live")
 STARAPI_TIMEOUT = float(os.getenv("STARAPI_TIMEOUT", "10"))
+# upstream quota across all worker processes (the bucket lives in the database):
+# every real HTTP call takes a token, cache hits do not
+STARAPI_RATE = float(os.getenv("STARAPI_RATE", "1"))      # requests/sec; 0 disables
+STARAPI_BURST = float(os.getenv("STARAPI_BURST", "5"))
+bucket = SharedTokenBucket("starapi", STARAPI_RATE, STARAPI_BURST)
 
 def _u(path: str) -> str:
     if not STARAPI_KEY:
         raise RuntimeError("STARAPI_KEY missing")
     return f"{BASE}/{STARAPI_KEY}/v1/{STARAPI_MODE}/{path.lstrip('/')}"
 
+def _http():
+    # imported on first upstream call: requests costs ~100ms of import time on every cold start
+    import requests
+    return requests
+
+def _raise_if_transient(r):
+    # rate limits and upstream errors are not answers; let callers retry instead of caching "not found"
+    if r.status_code == 429 or r.status_code >= 500:
+        r.raise_for_status()
+
 def fetch_user_org(handle: str) -> dict | None:
     """Return {'sid': '03B', 'name': 'Bulwark Bastion Brigade', 'rank': 'Member'} or None."""
     url = _u(f"user/{handle}")
-    r = requests.get(url, timeout=STARAPI_TIMEOUT)
+    bucket.acquire()
+    r = _http().get(url, timeout=STARAPI_TIMEOUT)
+    _raise_if_transient(r)
     if r.status_code != 200:
         return None
     data = r.json() or {}
@@ -27,7 +45,9 @@ def fetch_user_org(handle: str) -> dict | None:
 def fetch_org_info(sid: str) -> dict | None:
     """Return org metadata to persist into organizations table."""
     url = _u(f"organization/{sid}")
-    r = requests.get(url, timeout=STARAPI_TIMEOUT)
+    bucket.acquire()
+    r = _http().get(url, timeout=STARAPI_TIMEOUT)
+    _raise_if_transient(r)
     if r.status_code != 200:
         return None
     data = r.json() or {}
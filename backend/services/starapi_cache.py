@@ -0,0 +1,135 @@
+# backend/services/starapi_cache.py
+"""Cache in front of services.starapi: per-process LRU -> starapi_cache table -> HTTP.
+
+User->org and org metadata have separate TTLs, "not found" answers are cached
+for a shorter negative TTL, and concurrent lookups of the same key share one
+upstream call. Transient upstream errors (network, 429, 5xx) propagate and are
+never cached.
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from backend.cache import LRUCache
+from backend.database import SessionLocal
+from backend.models import StarapiCacheEntry
+from backend.services import starapi
+
+USER_TTL = float(os.getenv("STARAPI_USER_TTL", str(6 * 3600)))
+ORG_TTL = float(os.getenv("STARAPI_ORG_TTL", str(24 * 3600)))
+NEGATIVE_TTL = float(os.getenv("STARAPI_NEGATIVE_TTL", "3600"))
+MEMORY_SIZE = int(os.getenv("STARAPI_CACHE_SIZE", "5000"))
+
+_memory = LRUCache(MEMORY_SIZE)  # key -> (value, expires_at monotonic)
+stats = {"memory_hits": 0, "db_hits": 0, "misses": 0, "coalesced": 0, "errors": 0}
+_stats_lock = threading.Lock()
+
+
+def _count(name: str):
+    with _stats_lock:
+        stats[name] += 1
+
+
+class _SingleFlight:
+    """Collapse concurrent calls for the same key into one; followers get the leader's result."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict = {}
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = {"done": threading.Event(), "value": None, "error": None}
+        if not leader:
+            _count("coalesced")
+            call["done"].wait()
+            if call["error"] is not None:
+                raise call["error"]
+            return call["value"]
+        try:
+            call["value"] = fn()
+            return call["value"]
+        except Exception as e:
+            call["error"] = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call["done"].set()
+
+
+_flight = _SingleFlight()
+
+
+def _db_get(key: str):
+    db = SessionLocal()
+    try:
+        row = db.get(StarapiCacheEntry, key)
+        if row is None or row.expires_at <= datetime.utcnow():
+            return False, None, None
+        ttl = (row.expires_at - datetime.utcnow()).total_seconds()
+        return True, (json.loads(row.value) if row.value is not None else None), ttl
+    finally:
+        db.close()
+
+
+def _db_put(key: str, value, ttl: float):
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        db.merge(StarapiCacheEntry(key=key, value=json.dumps(value) if value is not None else None,
+                                   fetched_at=now, expires_at=now + timedelta(seconds=ttl)))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print("starapi cache write failed:", e)
+    finally:
+        db.close()
+
+
+def _lookup(key: str, fetch, ttl: float):
+    hit = _memory.get(key)
+    if hit is not None and hit[1] > time.monotonic():
+        _count("memory_hits")
+        return hit[0]
+
+    def load():
+        found, value, remaining = _db_get(key)
+        if found:
+            _count("db_hits")
+            _memory.set(key, (value, time.monotonic() + remaining))
+            return value
+        _count("misses")
+        try:
+            value = fetch()
+        except Exception:
+            _count("errors")
+            raise
+        life = ttl if value is not None else NEGATIVE_TTL
+        _memory.set(key, (value, time.monotonic() + life))
+        _db_put(key, value, life)
+        return value
+
+    return _flight.do(key, load)
+
+
+def fetch_user_org(handle: str) -> dict | None:
+    return _lookup(f"user:{handle.lower()}", lambda: starapi.fetch_user_org(handle), USER_TTL)
+
+
+def fetch_org_info(sid: str) -> dict | None:
+    return _lookup(f"org:{sid.upper()}", lambda: starapi.fetch_org_info(sid), ORG_TTL)
+
+
+def cache_stats() -> dict:
+    with _stats_lock:
+        out = dict(stats)
+    lookups = out["memory_hits"] + out["db_hits"] + out["misses"] + out["coalesced"]
+    out["hit_ratio"] = round((lookups - out["misses"]) / lookups, 4) if lookups else None
+    out["memory_entries"] = len(_memory)
+    return out
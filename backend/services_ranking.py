@@ -1,14 +1,67 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import Table, bindparam, case, func
+from sqlalchemy.orm import Session, load_only
 from backend.models import Player
 from datetime import datetime
-def decay_factor(days_since_last: float) -> float:
-    return 0.05 * days_since_last
+
+DECAY_PER_DAY = 0.05
+_EPOCH = datetime(1970, 1, 1)
+
+def _epoch_days(when: datetime) -> float:
+    return (when - _EPOCH).total_seconds() / 86400.0
+
+def base_score(total_kills: int, total_attacks: int, value_destroyed: float) -> float:
+    return 2 * (total_kills or 0) + 1 * (total_attacks or 0) + ((value_destroyed or 0.0) / 100000.0)
+
+def rank_key(base: float, last_seen: datetime | None) -> float:
+    """Decay is linear in time, so base + DECAY*last_seen orders players the same at any `now`."""
+    return base + DECAY_PER_DAY * _epoch_days(last_seen or datetime.utcnow())
+
+def score_at(base: float, key: float | None, now: datetime | None = None) -> float:
+    """Decayed score from the stored base/rank_key; never above base (last_seen in the future)."""
+    if key is None:
+        return base or 0.0
+    return min(base or 0.0, key - DECAY_PER_DAY * _epoch_days(now or datetime.utcnow()))
+
+def decay_credit(last_seen: datetime) -> float:
+    """The part of rank_key contributed by last_seen."""
+    return DECAY_PER_DAY * _epoch_days(last_seen)
+
+def player_stats_update(t: Table):
+    """UPDATE players applying :dk/:da/:dv deltas and a :seen time, keeping score/rank_key in step.
+
+    Everything is computed server-side from the row's current values (SET expressions
+    see the pre-update row), so concurrent writers compose instead of overwriting.
+    """
+    kills = func.coalesce(t.c.total_kills, 0) + bindparam("dk")
+    attacks = func.coalesce(t.c.total_attacks, 0) + bindparam("da")
+    value = func.coalesce(t.c.value_destroyed, 0.0) + bindparam("dv")
+    new_score = 2 * kills + 1 * attacks + value / 100000.0
+    advance = (t.c.last_seen.is_(None)) | (t.c.rank_key.is_(None)) | (t.c.last_seen < bindparam("seen"))
+    return (
+        t.update()
+        .where(t.c.player_id == bindparam("pid"))
+        .values(
+            total_kills=kills,
+            total_attacks=attacks,
+            value_destroyed=value,
+            score=new_score,
+            # rank_key - score is the old last_seen credit; keep it unless this event is newer
+            rank_key=new_score + case((advance, bindparam("seen_credit")), else_=t.c.rank_key - t.c.score),
+            last_seen=case((advance, bindparam("seen")), else_=t.c.last_seen),
+        )
+    )
+
+def refresh_player(p: Player) -> None:
+    """Recompute the stored base score and rank key for one player after its stats changed."""
+    p.score = base_score(p.total_kills, p.total_attacks, p.value_destroyed)
+    p.rank_key = rank_key(p.score, p.last_seen)
+
 def recompute_scores(db: Session):
-    now = datetime.utcnow()
-    players = db.query(Player).all()
-    for p in players:
-        days = max(0.0, (now - p.last_seen).total_seconds() / 86400.0)
-        p.score = 2 * p.total_kills + 1 * p.total_attacks + (p.value_destroyed / 100000.0) - decay_factor(days)
+    """Full rebuild of score/rank_key; only needed for backfills, reads use the stored keys."""
+    cols = load_only(Player.player_id, Player.total_kills, Player.total_attacks, Player.value_destroyed,
+                     Player.last_seen, Player.score, Player.rank_key)
+    for p in db.query(Player).options(cols).all():
+        refresh_player(p)
         db.add(p)
     db.flush()
     db.commit()
@@ -0,0 +1,159 @@
+# backend/startup.py
+"""Cold-start sequence run from the app lifespan.
+
+STARTUP_MODE=fast (default) yields to uvicorn straight away, so the port and
+/ops/healthz are up while the database wakes. The sequence then runs in the
+background: DB readiness with short async backoff, a schema version check
+(create_all/upgrade only when the stored version is behind), the enrichment
+workers, and a cache warm-up. Until it finishes, ReadinessGate holds /api
+requests for up to STARTUP_WAIT seconds instead of failing them.
+STARTUP_MODE=blocking runs the same steps before serving.
+"""
+import asyncio
+import os
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+STARTUP_MODE = os.getenv("STARTUP_MODE", "fast")
+DB_READY_TIMEOUT = float(os.getenv("DB_READY_TIMEOUT", "60"))
+STARTUP_WAIT = float(os.getenv("STARTUP_WAIT", "25"))
+WARM_PLAYERS = int(os.getenv("WARM_PLAYERS", "2000"))
+
+
+class StartupState:
+    def __init__(self):
+        self.phase = "starting"
+        self.timings: dict[str, float] = {}  # phase -> milliseconds
+        self.error: str | None = None
+        self.ready_event: asyncio.Event | None = None  # created on the serving loop by run()
+        self.workers = None
+
+    @property
+    def ready(self) -> bool:
+        return self.ready_event is not None and self.ready_event.is_set()
+
+    @contextmanager
+    def timed(self, phase: str):
+        self.phase = phase
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[phase] = round((time.perf_counter() - t0) * 1000, 1)
+
+    def report(self) -> dict:
+        return {"mode": STARTUP_MODE, "ready": self.ready, "phase": self.phase,
+                "timings_ms": dict(self.timings), "error": self.error}
+
+
+state = StartupState()
+
+
+def _ping():
+    from backend.database import engine
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+
+async def wait_for_db(timeout: float | None = DB_READY_TIMEOUT):
+    delay = 0.1
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    while True:
+        try:
+            return await run_in_threadpool(_ping)
+        except Exception as e:
+            if deadline is not None and time.monotonic() > deadline:
+                raise
+            print(f"[startup] DB not ready ({e.__class__.__name__}); retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 2.0)
+
+
+def _schema():
+    from backend.database import engine
+    from backend.migrations import ensure_schema
+    applied = ensure_schema(engine)
+    if applied is None:
+        print("[startup] schema current")
+    elif applied:
+        print("[startup] schema upgraded:", ", ".join(applied))
+
+
+def warm_caches():
+    """Recently active player ids and the default /bounties and /heatmap responses."""
+    from backend.database import SessionLocal
+    from backend.models import Player
+    from backend.response_cache import prime
+    from backend.routers.bounties import _bounties
+    from backend.routers.heatmap import _heatmap
+    import backend.crud as crud
+    with SessionLocal() as db:
+        rows = (db.query(Player.name, Player.player_id).filter(Player.name.isnot(None))
+                .order_by(Player.last_seen.desc()).limit(min(WARM_PLAYERS, crud.PLAYER_CACHE_SIZE)).all())
+        for name, pid in rows:
+            crud.player_ids.set(name, pid)
+        prime("/api/v1/bounties", lambda: _bounties(db, 25))
+        prime("/api/v1/heatmap", lambda: _heatmap(db, None, None, None, None))
+
+
+async def run(start_workers):
+    """The full startup sequence; `start_workers()` returns the enrichment pool to stop later."""
+    state.ready_event = asyncio.Event()
+    try:
+        with state.timed("db_ready"):
+            try:
+                await wait_for_db()
+            except Exception as e:
+                # stop holding requests (they fail fast now) but keep waiting for the database
+                state.error = f"db_ready: {e.__class__.__name__}"
+                state.ready_event.set()
+                await wait_for_db(None)
+                state.error = None
+        with state.timed("schema"):
+            try:
+                await run_in_threadpool(_schema)
+            except Exception as e:
+                state.error = f"schema: {e}"
+                print("[startup] failed during", state.error)
+        # the queue table may still be usable (another worker upgraded it); the workers
+        # log and back off on their own errors, so don't gate them on this step
+        with state.timed("workers"):
+            state.workers = start_workers()
+    except Exception as e:
+        state.error = state.error or f"{state.phase}: {e}"
+        print("[startup] failed during", state.error)
+    state.phase = "ready" if state.error is None else "degraded"
+    # serve even when degraded: requests then fail on their own errors instead of hanging here
+    state.ready_event.set()
+    if state.error is None:
+        try:
+            with state.timed("warm"):
+                await run_in_threadpool(warm_caches)
+        except Exception as e:
+            print("[startup] cache warm-up failed:", e)
+        state.phase = "ready"
+    print("[startup]", state.report())
+
+
+class ReadinessGate:
+    """Hold /api requests until startup is done (at most STARTUP_WAIT seconds, then 503)."""
+
+    def __init__(self, app: ASGIApp, prefix: str = "/api/"):
+        self.app = app
+        self.prefix = prefix
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        ev = state.ready_event
+        if scope["type"] == "http" and ev is not None and not ev.is_set() and scope["path"].startswith(self.prefix):
+            try:
+                await asyncio.wait_for(ev.wait(), STARTUP_WAIT)
+            except asyncio.TimeoutError:
+                await send({"type": "http.response.start", "status": 503,
+                            "headers": [(b"content-type", b"text/plain"), (b"retry-after", b"5")]})
+                await send({"type": "http.response.body", "body": f"Starting up ({state.phase})".encode()})
+                return
+        await self.app(scope, receive, send)
@@ -1,10 +1,40 @@
 # backend/tasks.py
+"""Org enrichment: jobs are queued in `enrichment_jobs` at ingest (crud.enqueue_enrichment)
+and drained here by a small worker pool, outside the request path.
+
+Each worker claims a batch of due jobs, resolves them through the cached StarAPI
+wrappers (upstream calls are throttled by starapi.bucket), writes Organization
+rows and PlayerOrganization links for the whole batch in one transaction, and
+reschedules failures with exponential backoff.
+"""
+import os
+import threading
 from contextlib import contextmanager
+from datetime import datetime, timedelta
+from sqlalchemy import and_, func, or_
 from sqlalchemy.orm import Session
 from backend.database import SessionLocal
-from backend.models import Organization
+from backend.models import EnrichmentJob, Organization, Player, PlayerOrganization
+import backend.crud as crud
 # OLD: from services.starapi import fetch_user_org, fetch_org_info
-from .services.starapi import fetch_user_org, fetch_org_info
+# cached wrappers: LRU + starapi_cache table + single-flight in front of the HTTP calls
+from .services.starapi_cache import fetch_user_org, fetch_org_info
+
+ENRICH_WORKERS = int(os.getenv("ENRICH_WORKERS", "2"))
+ENRICH_BATCH = int(os.getenv("ENRICH_BATCH", "10"))
+ENRICH_POLL = float(os.getenv("ENRICH_POLL", "2"))
+ENRICH_MAX_ATTEMPTS = int(os.getenv("ENRICH_MAX_ATTEMPTS", "6"))
+BACKOFF_BASE = 30.0        # seconds; doubles per attempt
+BACKOFF_MAX = 6 * 3600.0
+CLAIM_TIMEOUT = timedelta(minutes=10)  # a 'running' job older than this belonged to a dead worker
+
+stats = {"done": 0, "retried": 0, "failed": 0}
+_stats_lock = threading.Lock()
+
+
+def _count(name: str, n: int = 1):
+    with _stats_lock:
+        stats[name] += n
 
 @contextmanager
 def session_scope():
@@ -31,21 +61,151 @@ def upsert_org(db: Session, org_meta: dict):
         if v is not None:
             setattr(org, k, v)
 
-def enrich_attacker_org(attacker_handle: str, attacker_player_id: int | None = None):
-    """Look up attacker's org via starcitizen-api and persist Organization (and optionally link Player)."""
-    try:
-        u = fetch_user_org(attacker_handle)
-        if not u or not u.get("sid"):
-            return
-        meta = fetch_org_info(u["sid"]) or {"sid": u["sid"], "name": u.get("name")}
-        with session_scope() as db:
-            upsert_org(db, meta)
-            # OPTIONAL (for later many-to-many linkage):
-            # if attacker_player_id:
-            #     from models import Player, PlayerOrganization
-            #     p = db.get(Player, attacker_player_id)
-            #     if p:
-            #         # create PlayerOrganization link here...
-            #         pass
-    except Exception as e:
-        print("enrich_attacker_org failed:", e)
+def enrich_attacker_org(attacker_handle: str):
+    """Look up one handle; returns (user_org, org_meta), both None when the handle has no org."""
+    u = fetch_user_org(attacker_handle)
+    if not u or not u.get("sid"):
+        return None, None
+    meta = fetch_org_info(u["sid"]) or {"sid": u["sid"], "name": u.get("name")}
+    return u, meta
+
+# ---- queue ----
+def _due_filter(now: datetime):
+    t = EnrichmentJob
+    return or_(
+        and_(t.status == "pending", t.next_attempt_at <= now),
+        and_(t.status == "running", t.claimed_at < now - CLAIM_TIMEOUT),
+    )
+
+def claim_jobs(db: Session, limit: int) -> list:
+    """Claim up to `limit` due jobs; the conditional UPDATE makes each claim exclusive across workers.
+
+    Returns plain (id, handle, player_id, attempts) rows and commits, so no transaction
+    (and no pooled connection) is held while the caller talks to StarAPI.
+    """
+    now = datetime.utcnow()
+    ids = [i for (i,) in db.query(EnrichmentJob.id).filter(_due_filter(now))
+           .order_by(EnrichmentJob.next_attempt_at).limit(limit)]
+    claimed = []
+    for job_id in ids:
+        n = (db.query(EnrichmentJob)
+             .filter(EnrichmentJob.id == job_id, _due_filter(now))
+             .update({"status": "running", "claimed_at": now}, synchronize_session=False))
+        if n == 1:
+            claimed.append(job_id)
+    jobs = (db.query(EnrichmentJob.id, EnrichmentJob.handle, EnrichmentJob.player_id, EnrichmentJob.attempts)
+            .filter(EnrichmentJob.id.in_(claimed)).all()) if claimed else []
+    db.commit()
+    return jobs
+
+def queue_depth(db: Session) -> dict:
+    rows = db.query(EnrichmentJob.status, func.count()).group_by(EnrichmentJob.status).all()
+    return {status: n for status, n in rows}
+
+def _store_results(db: Session, found: list[tuple]):
+    """Batch-write organizations and player links for successfully enriched jobs."""
+    if not found:
+        return
+    insert = crud.dialect_insert(db)
+    orgs = {}
+    for _, _, meta in found:
+        orgs[meta["sid"]] = meta
+    t = Organization.__table__
+    stmt = insert(t).values([
+        {"sid": sid, "name": m.get("name"), "logo": m.get("logo"), "url": m.get("url"), "member_count": m.get("member_count")}
+        for sid, m in orgs.items()
+    ])
+    stmt = stmt.on_conflict_do_update(index_elements=[t.c.sid], set_={
+        k: func.coalesce(stmt.excluded[k], t.c[k]) for k in ("name", "logo", "url", "member_count")
+    } | {"updated_at": func.now()})
+    db.execute(stmt)
+
+    missing_ids = {job.handle for job, _, _ in found if job.player_id is None}
+    by_name = dict(db.query(Player.name, Player.player_id).filter(Player.name.in_(missing_ids))) if missing_ids else {}
+    now = datetime.utcnow()
+    links = {}
+    for job, u, _ in found:
+        pid = job.player_id or by_name.get(job.handle)
+        if pid is not None:
+            links[(pid, u["sid"])] = {"player_id": pid, "org_sid": u["sid"], "is_primary": True, "rank": u.get("rank"),
+                                      "source": "starapi", "first_seen": now, "last_seen": now}
+    if links:
+        lt = PlayerOrganization.__table__
+        stmt = insert(lt).values(list(links.values()))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[lt.c.player_id, lt.c.org_sid],
+            set_={"rank": stmt.excluded.rank, "is_primary": True, "last_seen": stmt.excluded.last_seen},
+        )
+        db.execute(stmt)
+
+def run_batch(db: Session, limit: int = ENRICH_BATCH) -> int:
+    """Claim and process one batch; returns the number of jobs handled.
+
+    Three short transactions: the claim, then the upstream lookups with no
+    transaction open (they may sleep on the rate limiter), then one write of the
+    results and job states.
+    """
+    jobs = claim_jobs(db, limit)
+    if not jobs:
+        return 0
+    found, done_ids, retries = [], [], []
+    for job in jobs:
+        try:
+            u, meta = enrich_attacker_org(job.handle)
+        except Exception as e:
+            retries.append((job, str(e)[:500]))
+            continue
+        done_ids.append(job.id)
+        if u is not None:
+            found.append((job, u, meta))
+
+    now = datetime.utcnow()
+    _store_results(db, found)
+    if done_ids:
+        (db.query(EnrichmentJob).filter(EnrichmentJob.id.in_(done_ids))
+         .update({"status": "done", "attempts": func.coalesce(EnrichmentJob.attempts, 0) + 1, "last_error": None},
+                 synchronize_session=False))
+    for job, error in retries:
+        attempts = (job.attempts or 0) + 1
+        values = {"attempts": attempts, "last_error": error}
+        if attempts >= ENRICH_MAX_ATTEMPTS:
+            values["status"] = "failed"
+            _count("failed")
+        else:
+            values["status"] = "pending"
+            values["next_attempt_at"] = now + timedelta(seconds=min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX))
+            _count("retried")
+        db.query(EnrichmentJob).filter(EnrichmentJob.id == job.id).update(values, synchronize_session=False)
+    db.commit()
+    _count("done", len(done_ids))
+    return len(jobs)
+
+# ---- worker pool ----
+class EnrichmentWorkers:
+    def __init__(self, n: int = ENRICH_WORKERS):
+        self.n = n
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def start(self):
+        for i in range(self.n):
+            t = threading.Thread(target=self._run, name=f"enrich-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                with session_scope() as db:
+                    handled = run_batch(db)
+            except Exception as e:
+                print("enrichment worker error:", e)
+                handled = 0
+            if not handled:
+                self._stop.wait(ENRICH_POLL)
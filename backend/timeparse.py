@@ -0,0 +1,56 @@
+# backend/timeparse.py
+"""One shared parser for the timestamp strings clients send.
+
+Known shapes: game log `2949-09-23 21:23:24.123` (optionally still wrapped in the
+log's `<...>`), ISO 8601 with `T`, `Z` or an explicit offset. Everything is returned as naive UTC to match the DateTime
+columns elsewhere in the schema.
+
+Game logs carry in-universe years, a fixed GAME_YEAR_OFFSET ahead of the real
+calendar (2949 is 2019); those are shifted back to wall-clock UTC here.
+"""
+from datetime import datetime, timedelta, timezone
+
+GAME_YEAR_OFFSET = 930
+GAME_YEAR_MIN = 2900  # no real client clock is this far ahead, so these are in-universe years
+# after the year shift, anything further ahead than this is a broken clock, not an event time
+MAX_FUTURE_SKEW = timedelta(days=1)
+
+
+def _from_game_year(dt: datetime) -> datetime:
+    try:
+        return dt.replace(year=dt.year - GAME_YEAR_OFFSET)
+    except ValueError:  # Feb 29 of a game leap year that maps onto a common year
+        return dt.replace(year=dt.year - GAME_YEAR_OFFSET, day=28)
+
+
+def parse_ts(value: str | None) -> datetime | None:
+    """Parse a client timestamp to naive UTC, or None if it is not a recognised format."""
+    if not value:
+        return None
+    s = value.strip()
+    if s.startswith("<") and s.endswith(">"):
+        s = s[1:-1]
+    if s.endswith(("Z", "z")):
+        s = s[:-1] + "+00:00"
+    try:
+        dt = datetime.fromisoformat(s)
+    except ValueError:
+        return None
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    if dt.year >= GAME_YEAR_MIN:
+        dt = _from_game_year(dt)
+    return dt
+
+
+def event_time(value: str | None, received_at: datetime | None = None) -> datetime | None:
+    """Wall-clock time an event happened, or None when the timestamp can't be placed.
+
+    None (unparseable, or still in the future after the game-year shift) is stored
+    as NULL rather than guessed; aggregates fall back to the receive time themselves.
+    """
+    received_at = received_at or datetime.utcnow()
+    dt = parse_ts(value)
+    if dt is None or dt > received_at + MAX_FUTURE_SKEW:
+        return None
+    return dt
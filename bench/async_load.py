@@ -0,0 +1,112 @@
+# bench/async_load.py — same read/write mix against the sync and the DB_ASYNC=1 backend
+#
+#   python -m bench.async_load                         # temp SQLite file
+#   python -m bench.async_load --database-url postgresql://...  -c 200
+#
+# Starts one uvicorn worker per mode (so concurrency is bounded by the threadpool
+# in sync mode and by the connection pool in async mode), seeds it, then reports
+# throughput and latency percentiles for each.
+import argparse, os, subprocess, sys, tempfile, time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+ROOT = Path(__file__).resolve().parents[1]
+KEY = "bench-client-key"
+
+
+def percentiles(xs):
+    xs = sorted(xs)
+    pick = lambda q: xs[min(len(xs) - 1, int(len(xs) * q))] * 1000 if xs else float("nan")
+    return pick(0.50), pick(0.95), pick(0.99)
+
+
+def start_server(port: int, env_overrides: dict):
+    env = dict(os.environ, CLIENT_API_KEY=KEY, **env_overrides)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.app:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env,
+    )
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            if requests.get(f"{url}/ops/healthz", timeout=1).ok:
+                return proc, url
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    proc.kill()
+    raise SystemExit(f"server on :{port} did not start")
+
+
+def seed(url: str, n_events: int):
+    from bench.synth import ZONES
+    batch = []
+    for i in range(n_events):
+        batch.append({
+            "timestamp": "2026-01-01T00:00:00Z", "attacker_name": f"Pirate{i % 300}", "victim_name": f"Member{i % 50}",
+            "zone": ZONES[i % len(ZONES)], "coords": {"x": (i * 37) % 20000, "y": 0.0, "z": 0.0},
+            "damage_type": "VehicleDestruction", "ship_value_estimate": 1000.0,
+        })
+        if len(batch) == 500:
+            requests.post(f"{url}/api/v1/events/batch", json=batch, headers={"X-API-Key": KEY}, timeout=60).raise_for_status()
+            batch = []
+    if batch:
+        requests.post(f"{url}/api/v1/events/batch", json=batch, headers={"X-API-Key": KEY}, timeout=60).raise_for_status()
+
+
+def drive(url: str, n: int, concurrency: int):
+    s = requests.Session()
+    s.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=concurrency))
+    paths = ["/api/v1/bounties", "/api/v1/heatmap", "/api/v1/pirates/by-name?name=Pirate1", "/api/v1/roster"]
+
+    def one(i):
+        t0 = time.perf_counter()
+        try:
+            return _one(i, t0)
+        except requests.RequestException:
+            return time.perf_counter() - t0, False
+
+    def _one(i, t0):
+        if i % 10 == 0:
+            r = s.post(f"{url}/api/v1/events", headers={"X-API-Key": KEY}, timeout=60, json={
+                "timestamp": "2026-01-01T00:00:00Z", "attacker_name": f"Pirate{i % 300}", "victim_name": "Member1",
+                "zone": "Stanton", "coords": {"x": 1.0, "y": 2.0, "z": 3.0}, "damage_type": "VehicleDestruction"})
+        else:
+            r = s.get(url + paths[i % len(paths)], timeout=60)
+        return time.perf_counter() - t0, r.status_code < 400
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as ex:
+        res = list(ex.map(one, range(n)))
+    wall = time.perf_counter() - t0
+    lat = [d for d, _ in res]
+    return n / wall, percentiles(lat), sum(1 for _, ok in res if not ok)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--database-url", help="default: a fresh temp SQLite file per mode")
+    ap.add_argument("-n", "--requests", type=int, default=2000)
+    ap.add_argument("-c", "--concurrency", type=int, default=100)
+    ap.add_argument("--seed-events", type=int, default=5000)
+    ap.add_argument("--port", type=int, default=8790)
+    args = ap.parse_args(argv)
+
+    tmp = tempfile.mkdtemp(prefix="pirate-bench-")
+    for i, mode in enumerate(("0", "1")):
+        db_url = args.database_url or f"sqlite:///{tmp}/async{mode}.db"
+        proc, url = start_server(args.port + i, {"DB_ASYNC": mode, "DATABASE_URL": db_url})
+        try:
+            seed(url, args.seed_events)
+            rps, (p50, p95, p99), errors = drive(url, args.requests, args.concurrency)
+        finally:
+            proc.terminate()
+            proc.wait(10)
+        label = "async" if mode == "1" else "sync "
+        print(f"{label}  {rps:8.0f} req/s   p50 {p50:7.1f} ms   p95 {p95:7.1f} ms   p99 {p99:7.1f} ms   errors {errors}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
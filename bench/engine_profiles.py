@@ -0,0 +1,83 @@
+# bench/engine_profiles.py — mixed read/write load under each DB_PROFILE
+#
+#   python -m bench.engine_profiles                              # temp SQLite file per profile
+#   python -m bench.engine_profiles --database-url postgresql://... [--pgbouncer-url postgresql://...:6432/...]
+#
+# One uvicorn worker per profile, a fresh database (SQLite) or the given one,
+# the response cache off (RESPONSE_CACHE_TTL=0) so every read reaches the DB,
+# then --write-ratio of requests are POST /events and the rest are the usual
+# read endpoints. Reports throughput, latency percentiles and failed requests.
+import argparse, sys, tempfile, time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from bench.async_load import KEY, percentiles, seed, start_server
+
+READS = ["/api/v1/bounties", "/api/v1/heatmap", "/api/v1/pirates/by-name?name=Pirate1", "/api/v1/roster",
+         "/api/v1/events?limit=50"]
+
+
+def drive(url: str, n: int, concurrency: int, write_ratio: float):
+    s = requests.Session()
+    s.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=concurrency))
+    every = max(1, round(1 / write_ratio)) if write_ratio > 0 else 0
+
+    def one(i):
+        t0 = time.perf_counter()
+        is_write = bool(every) and i % every == 0
+        try:
+            if is_write:
+                r = s.post(f"{url}/api/v1/events", headers={"X-API-Key": KEY}, timeout=60, json={
+                    "timestamp": "2026-01-01T00:00:00Z", "attacker_name": f"Pirate{i % 300}", "victim_name": "Member1",
+                    "zone": "Stanton", "coords": {"x": 1.0, "y": 2.0, "z": 3.0}, "damage_type": "VehicleDestruction"})
+            else:
+                r = s.get(url + READS[i % len(READS)], timeout=60)
+            ok = r.status_code < 400
+        except requests.RequestException:
+            ok = False
+        return is_write, time.perf_counter() - t0, ok
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as ex:
+        res = list(ex.map(one, range(n)))
+    wall = time.perf_counter() - t0
+    reads = [d for w, d, _ in res if not w]
+    writes = [d for w, d, _ in res if w]
+    return n / wall, percentiles(reads), percentiles(writes), sum(1 for *_, ok in res if not ok)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--database-url", help="Postgres URL to compare default/tuned against (default: temp SQLite)")
+    ap.add_argument("--pgbouncer-url", help="same database behind a transaction-pooling PgBouncer")
+    ap.add_argument("-n", "--requests", type=int, default=2000)
+    ap.add_argument("-c", "--concurrency", type=int, default=32)
+    ap.add_argument("-w", "--write-ratio", type=float, default=0.25)
+    ap.add_argument("--seed-events", type=int, default=5000)
+    ap.add_argument("--async-db", action="store_true", help="run the servers with DB_ASYNC=1")
+    ap.add_argument("--port", type=int, default=8810)
+    args = ap.parse_args(argv)
+
+    tmp = tempfile.mkdtemp(prefix="pirate-profiles-")
+    runs = [("default", {"DB_PROFILE": "default"}), ("tuned", {"DB_PROFILE": "tuned"})]
+    if args.pgbouncer_url:
+        runs.append(("pgbouncer", {"DB_PROFILE": "tuned", "PG_POOL_MODE": "pgbouncer", "DATABASE_URL": args.pgbouncer_url}))
+
+    print(f"{'profile':10} {'req/s':>7}   {'read p50/p95/p99 ms':>22}   {'write p50/p95/p99 ms':>23}   errors")
+    for i, (label, env) in enumerate(runs):
+        env = {"DATABASE_URL": args.database_url or f"sqlite:///{tmp}/{label}.db", "RESPONSE_CACHE_TTL": "0",
+               "DB_ASYNC": "1" if args.async_db else "0", **env}
+        proc, url = start_server(args.port + i, env)
+        try:
+            seed(url, args.seed_events)
+            rps, rp, wp, errors = drive(url, args.requests, args.concurrency, args.write_ratio)
+        finally:
+            proc.terminate()
+            proc.wait(10)
+        fmt = lambda p: "/".join(f"{x:.0f}" for x in p)
+        print(f"{label:10} {rps:7.0f}   {fmt(rp):>22}   {fmt(wp):>23}   {errors}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
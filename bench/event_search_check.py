@@ -0,0 +1,126 @@
+# bench/event_search_check.py — regression gate for GET /events (keyset search)
+#
+#   python -m bench.event_search_check                     # temp SQLite file, 50k events
+#   python -m bench.event_search_check --database-url postgresql://... -n 200000
+#
+# Seeds synthetic events, then for every filter runs the first page and a deep page
+# through routers.events.search_events and checks that
+#   * each page is exactly one SQL statement (no N+1 from lazy relationships),
+#   * the plan reads an index rather than scanning the events table,
+#   * a deep page costs about the same as the first one.
+# Exits non-zero on any failure. tests/test_query_plans.py runs the plan checks under
+# pytest on a small SQLite dataset; this script is the at-scale / Postgres variant.
+import argparse, os, random, statistics, sys, tempfile, time
+from datetime import datetime, timedelta
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--database-url", default=None)
+    ap.add_argument("-n", "--events", type=int, default=50_000)
+    ap.add_argument("--limit", type=int, default=50)
+    ap.add_argument("--max-deep-ratio", type=float, default=3.0)
+    args = ap.parse_args(argv)
+
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/search.db"
+    from sqlalchemy import event, text
+    from backend.database import Base, SessionLocal, engine
+    from backend.migrations import upgrade
+    from backend.models import Event
+    from backend.routers.events import search_events
+    from bench.synth import ZONES
+
+    Base.metadata.create_all(engine)
+    upgrade(engine)
+    pirates = [f"Pirate{i}" for i in range(200)]
+    victims = [f"Victim{i}" for i in range(2000)]
+    orgs = [f"ORG{i}" for i in range(20)] + [None]
+    rng = random.Random(7)
+    with engine.begin() as conn:
+        if not conn.execute(text("SELECT 1 FROM events LIMIT 1")).first():
+            rows = [{
+                "timestamp": f"2949-{1 + i * 12 // args.events:02d}-{1 + i % 28:02d} 12:00:00",
+                "occurred_at": datetime(2024, 1, 1) + timedelta(minutes=i),
+                "attacker_name": rng.choice(pirates), "attacker_org": rng.choice(orgs),
+                "victim_name": rng.choice(victims), "zone": rng.choice(ZONES),
+                "damage_type": rng.choice(["VehicleDestruction", "Bullet", "Crash"]),
+                "ship_value_estimate": 0.0, "confirmed": rng.random() > 0.01,
+            } for i in range(args.events)]
+            for i in range(0, len(rows), 5000):
+                conn.execute(Event.__table__.insert(), rows[i:i + 5000])
+        if engine.dialect.name == "postgresql":
+            conn.execute(text("ANALYZE events"))
+        else:
+            conn.execute(text("ANALYZE"))
+
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    def explain(statement, parameters):
+        with engine.connect() as conn:
+            if engine.dialect.name == "postgresql":
+                raw = conn.exec_driver_sql("EXPLAIN " + statement, parameters).fetchall()
+                plan = "\n".join(r[0] for r in raw)
+                return plan, "Seq Scan on events" in plan, "Sort" in plan
+            raw = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+            plan = "\n".join(r[-1] for r in raw)
+            full_scan = any(l.strip().startswith("SCAN events") and "USING" not in l for l in plan.splitlines())
+            return plan, full_scan, "TEMP B-TREE FOR ORDER BY" in plan
+
+    cases = {
+        "attacker": ({"attacker_name": "Pirate3"}, None, None),
+        "victim": ({"victim_name": "Victim42"}, None, None),
+        "org": ({"attacker_org": "ORG5"}, None, None),
+        "zone": ({"zone": ZONES[0]}, None, None),
+        "damage_type": ({"damage_type": "Crash"}, None, None),
+        "unconfirmed": ({"confirmed": False}, None, None),
+        "attacker+zone": ({"attacker_name": "Pirate3", "zone": ZONES[0]}, None, None),
+        "time window": ({}, datetime(2024, 1, 10), datetime(2024, 1, 11)),
+    }
+
+    def page(db, filters, since, until, cursor):
+        statements.clear()
+        t0 = time.perf_counter()
+        result = search_events(db, filters, since, until, cursor, args.limit)
+        return result, time.perf_counter() - t0, list(statements)
+
+    failures = []
+    db = SessionLocal()
+    try:
+        print(f"{'case':16} {'first ms':>9} {'deep ms':>9} {'queries':>8}  plan")
+        for name, (filters, since, until) in cases.items():
+            # walk to the last page to find the deepest cursor, then time first vs deep
+            cursor, deepest = None, None
+            while True:
+                result, _, _ = page(db, filters, since, until, cursor)
+                if result.next_cursor is None:
+                    break
+                deepest = cursor = result.next_cursor
+            first = [page(db, filters, since, until, None) for _ in range(5)]
+            deep = [page(db, filters, since, until, deepest) for _ in range(5)] if deepest else first
+            t_first = statistics.median(t for _, t, _ in first) * 1000
+            t_deep = statistics.median(t for _, t, _ in deep) * 1000
+            n_queries = max(len(s) for _, _, s in first + deep)
+            plan, full_scan, sorts = explain(*deep[0][2][0])
+            print(f"{name:16} {t_first:9.2f} {t_deep:9.2f} {n_queries:8d}  {plan.splitlines()[0].strip()}")
+            if n_queries != 1:
+                failures.append(f"{name}: {n_queries} queries per page (N+1?)")
+            if full_scan:
+                failures.append(f"{name}: full scan of events:\n{plan}")
+            if sorts:
+                failures.append(f"{name}: page sorts its matches instead of reading an index in order:\n{plan}")
+            if t_deep > args.max_deep_ratio * t_first + 2.0:
+                failures.append(f"{name}: deep page {t_deep:.1f}ms vs first {t_first:.1f}ms")
+    finally:
+        db.close()
+
+    for f in failures:
+        print("FAIL", f)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+# bench/ingest_stress.py — concurrent POST /events against a running backend, then check counters
+#
+#   uvicorn backend.app:app --workers 4 --port 8000 &
+#   python -m bench.ingest_stress --url http://127.0.0.1:8000 --key $CLIENT_API_KEY -n 1000 -c 32
+#
+# Uses run-unique player names, so it can point at a database that already has data.
+# Exits non-zero if any player's kills/attacks/value differ from what was sent.
+import argparse, sys, time, uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--url", default="http://127.0.0.1:8000")
+    ap.add_argument("--key", default="change-me-client")
+    ap.add_argument("-n", "--requests", type=int, default=500)
+    ap.add_argument("-c", "--concurrency", type=int, default=16)
+    ap.add_argument("--pirates", type=int, default=3, help="few attackers -> heavy contention on the same rows")
+    ap.add_argument("--victims", type=int, default=7)
+    args = ap.parse_args(argv)
+
+    run = uuid.uuid4().hex[:6]
+    base = args.url.rstrip("/") + "/api/v1"
+    sent_kills, sent_attacks, sent_value = Counter(), Counter(), Counter()
+
+    def event(i):
+        return {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "attacker_name": f"StressPirate{run}_{i % args.pirates}",
+            "victim_name": f"StressVictim{run}_{i % args.victims}",
+            "zone": "Stanton", "coords": {"x": 1.0, "y": 2.0, "z": 3.0},
+            "damage_type": "VehicleDestruction", "ship_value_estimate": 1000.0,
+        }
+
+    session = requests.Session()
+
+    def post(i):
+        ev = event(i)
+        r = session.post(f"{base}/events", json=ev, headers={"X-API-Key": args.key}, timeout=60)
+        return ev, r.status_code
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(args.concurrency) as ex:
+        results = list(ex.map(post, range(args.requests)))
+    elapsed = time.perf_counter() - t0
+
+    codes = Counter(code for _, code in results)
+    for ev, code in results:
+        if code == 200:
+            sent_kills[ev["attacker_name"]] += 1
+            sent_attacks[ev["attacker_name"]] += 1
+            sent_attacks[ev["victim_name"]] += 1
+            sent_value[ev["attacker_name"]] += ev["ship_value_estimate"]
+    print(f"{args.requests} requests in {elapsed:.1f}s ({args.requests / elapsed:.0f} req/s); status {dict(codes)}")
+
+    bad = 0
+    for name in sorted(sent_attacks):
+        p = session.get(f"{base}/pirates/by-name", params={"name": name}, timeout=30).json()
+        got = (p.get("total_kills"), p.get("total_attacks"), p.get("value_destroyed"))
+        want = (sent_kills[name], sent_attacks[name], sent_value[name])
+        if got != want:
+            bad += 1
+            print(f"MISMATCH {name}: got {got}, want {want}")
+    print("counters exact" if not bad else f"FAIL: {bad} players with lost/extra updates")
+    return 1 if bad else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+# bench/parser_bench.py — lines/sec for pirate_watcher.parser over a synthetic Game.log
+#
+#   python -m bench.parser_bench --lines 500000 --min-lps 1000000
+#
+# Exits non-zero if the fast parser disagrees with the reference regex or falls
+# below --min-lps / more than --tolerance under a saved --baseline.
+import argparse, json, sys, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "client"))
+from pirate_watcher import parser as P  # noqa: E402
+from bench.synth import synth_game_log  # noqa: E402
+
+
+def _reference_parse(line: str):
+    m = P.LINE_RE.search(line)
+    if not m:
+        return None
+    gd = m.groupdict()
+    name, org = P._split_attacker(gd.get("attacker_part", "").strip())
+    return (gd["ts"], gd["victim"], name, org, gd["zone"], gd["damage"], float(gd["x"]), float(gd["y"]), float(gd["z"]))
+
+
+def _key(d):
+    return (d["timestamp"], d["victim_name"], d["attacker_name"], d["attacker_org"], d["zone"], d["damage_type"],
+            d["coords"]["x"], d["coords"]["y"], d["coords"]["z"])
+
+
+def _timed(fn, lines, repeat):
+    best = float("inf")
+    out = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn(lines)
+        best = min(best, time.perf_counter() - t0)
+    return len(lines) / best, out
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--lines", type=int, default=200_000)
+    ap.add_argument("--kill-ratio", type=float, default=0.002)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--min-lps", type=float, default=0.0, help="fail below this many lines/s (parse_lines)")
+    ap.add_argument("--baseline", help="JSON file to compare against / write with --save")
+    ap.add_argument("--save", action="store_true", help="write results to --baseline")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs baseline")
+    args = ap.parse_args(argv)
+
+    lines = synth_game_log(args.lines, args.kill_ratio)
+    ref_lps, ref = _timed(lambda ls: [r for r in map(_reference_parse, ls) if r], lines, args.repeat)
+    line_lps, per_line = _timed(lambda ls: [d for d in map(P.parse_line, ls) if d], lines, args.repeat)
+    batch_lps, batch = _timed(lambda ls: list(P.parse_lines(ls)), lines, args.repeat)
+
+    if [_key(d) for d in batch] != ref or [_key(d) for d in per_line] != ref:
+        print("FAIL: fast parser output differs from reference LINE_RE")
+        return 1
+
+    results = {"reference_lps": ref_lps, "parse_line_lps": line_lps, "parse_lines_lps": batch_lps}
+    print(f"{len(lines)} lines, {len(ref)} kills")
+    for k, v in results.items():
+        print(f"  {k:16s} {v:14,.0f} lines/s")
+    print(f"  speedup          {batch_lps / ref_lps:14.1f}x")
+
+    rc = 0
+    if args.min_lps and batch_lps < args.min_lps:
+        print(f"FAIL: parse_lines {batch_lps:,.0f} < --min-lps {args.min_lps:,.0f}")
+        rc = 1
+    if args.baseline:
+        path = Path(args.baseline)
+        if args.save:
+            path.write_text(json.dumps(results, indent=2))
+            print("saved baseline ->", path)
+        elif path.exists():
+            base = json.loads(path.read_text())
+            for k, v in results.items():
+                if k in base and v < base[k] * (1 - args.tolerance):
+                    print(f"FAIL: {k} regressed {v:,.0f} vs baseline {base[k]:,.0f}")
+                    rc = 1
+    return rc
+
+
+if __name__ == "__main__":
+    sys.exit(main())
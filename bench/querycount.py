@@ -0,0 +1,59 @@
+# bench/querycount.py — SQL statements per request for each benchmarked endpoint
+#
+#   DATABASE_URL=sqlite:///... python -m bench.querycount     # prints one JSON object
+#
+# Runs in its own process (bench.suite spawns it per database) because the backend
+# binds its engine to DATABASE_URL at import. Requests go through TestClient
+# sequentially with a cursor-execute counter on the engine, so the numbers are
+# exact and independent of load.
+import json, os, sys, uuid
+
+SAMPLES = 20
+
+
+def count_queries(endpoints: dict) -> dict:
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+    from backend.app import app
+    from backend.database import async_engine, engine
+
+    n = [0]
+
+    def _count(*_):
+        n[0] += 1
+
+    engines = [engine] + ([async_engine.sync_engine] if async_engine is not None else [])
+    for e in engines:
+        event.listen(e, "before_cursor_execute", _count)
+    client = TestClient(app)  # no lifespan: the tables already exist and no enrichment workers run
+    out = {}
+    for name, request in endpoints.items():
+        n[0] = 0
+        for i in range(SAMPLES):
+            request(client, i)
+        out[name] = n[0] / SAMPLES
+    return out
+
+
+def default_endpoints(key: str, pirate: str) -> dict:
+    run = uuid.uuid4().hex[:6]
+
+    def post_event(c, i):
+        c.post("/api/v1/events", headers={"X-API-Key": key}, json={
+            "timestamp": "2026-01-01T00:00:00Z", "attacker_name": f"QcPirate{run}_{i % 3}", "victim_name": f"QcMember{run}",
+            "zone": "Stanton", "coords": {"x": 1.0, "y": 2.0, "z": 3.0}, "damage_type": "VehicleDestruction",
+        }).raise_for_status()
+
+    return {
+        "post_event": post_event,
+        "bounties": lambda c, i: c.get("/api/v1/bounties").raise_for_status(),
+        "heatmap": lambda c, i: c.get("/api/v1/heatmap").raise_for_status(),
+        "pirate_by_name": lambda c, i: c.get("/api/v1/pirates/by-name", params={"name": pirate}).raise_for_status(),
+    }
+
+
+if __name__ == "__main__":
+    os.environ.setdefault("ENRICH_WORKERS", "0")
+    os.environ["RESPONSE_CACHE_TTL"] = "0"  # count the real work, not cache hits
+    key = os.environ.get("CLIENT_API_KEY", "change-me-client")
+    print(json.dumps(count_queries(default_endpoints(key, sys.argv[1] if len(sys.argv) > 1 else "Pirate0000"))))
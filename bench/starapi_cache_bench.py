@@ -0,0 +1,94 @@
+# bench/starapi_cache_bench.py — hit rate / latency of the StarAPI cache against a local stub
+#
+#   python -m bench.starapi_cache_bench --lookups 5000 --handles 300 --latency-ms 150
+#
+# Runs a stub starcitizen-api on localhost (with artificial latency and a share
+# of unknown handles), then replays a skewed stream of enrichment lookups from a
+# thread pool through backend.services.starapi_cache against a temp SQLite DB.
+import argparse, json, os, random, sys, tempfile, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from bench.synth import zipf_choice
+
+upstream_calls = {"user": 0, "organization": 0}
+_lock = threading.Lock()
+
+
+def make_handler(latency: float, unknown_share: float):
+    class Stub(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            # /<key>/v1/live/<kind>/<name>
+            parts = self.path.strip("/").split("/")
+            kind, name = parts[-2], parts[-1]
+            with _lock:
+                upstream_calls[kind] = upstream_calls.get(kind, 0) + 1
+            time.sleep(latency)
+            if kind == "user":
+                known = (hash(name) % 1000) / 1000.0 >= unknown_share
+                body = {"success": 1, "data": {"organization": {"sid": f"ORG{hash(name) % 40}", "name": "Org", "rank": "Member"} if known else {}}}
+            else:
+                body = {"success": 1, "data": {"name": f"Org {name}", "members": 42, "url": f"https://example.invalid/{name}"}}
+            raw = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+
+    return Stub
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--lookups", type=int, default=3000)
+    ap.add_argument("--handles", type=int, default=300)
+    ap.add_argument("--threads", type=int, default=16)
+    ap.add_argument("--latency-ms", type=float, default=150)
+    ap.add_argument("--unknown-share", type=float, default=0.2, help="handles with no org (negative results)")
+    args = ap.parse_args(argv)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.latency_ms / 1000, args.unknown_share))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    tmp = tempfile.mkdtemp(prefix="starapi-bench-")
+    # measure the cache, not the shared upstream token bucket (STARAPI_RATE=0 disables it)
+    os.environ.setdefault("STARAPI_RATE", "0")
+    os.environ.update(STARAPI_BASE=f"http://127.0.0.1:{server.server_port}", STARAPI_KEY="stub",
+                      DATABASE_URL=f"sqlite:///{tmp}/cache.db")
+
+    from backend.database import Base, engine
+    from backend import models  # noqa: F401
+    Base.metadata.create_all(bind=engine)
+    from backend.services import starapi_cache as sc
+
+    rng = random.Random(7)
+    handles = [f"Pirate{i:04d}" for i in range(args.handles)]
+    stream = [zipf_choice(rng, handles) for _ in range(args.lookups)]
+
+    def enrich(handle):
+        t0 = time.perf_counter()
+        u = sc.fetch_user_org(handle)
+        if u and u.get("sid"):
+            sc.fetch_org_info(u["sid"])
+        return time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(args.threads) as ex:
+        lat = sorted(ex.map(enrich, stream))
+    wall = time.perf_counter() - t0
+    server.shutdown()
+
+    pick = lambda q: lat[min(len(lat) - 1, int(len(lat) * q))] * 1000
+    naive = args.lookups * (2 - args.unknown_share)
+    calls = sum(upstream_calls.values())
+    print(f"{args.lookups} enrichments over {args.handles} handles in {wall:.1f}s")
+    print(f"  upstream calls   {calls} (uncached would be ~{naive:.0f})  user={upstream_calls['user']} org={upstream_calls['organization']}")
+    print(f"  latency          p50 {pick(0.5):.3f} ms  p95 {pick(0.95):.1f} ms  p99 {pick(0.99):.1f} ms")
+    print(f"  cache            {sc.cache_stats()}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
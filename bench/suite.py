@@ -0,0 +1,152 @@
+# bench/suite.py — end-to-end load benchmark for ingest and the main read endpoints
+#
+#   python -m bench.suite                                          # temp SQLite file
+#   python -m bench.suite --postgres postgresql://localhost/pirates_bench
+#   python -m bench.suite --save-baseline bench/baseline.json      # record
+#   python -m bench.suite --baseline bench/baseline.json           # compare; exits 1 on regression
+#
+# For each database: start a uvicorn backend, seed --players/--events synthetic kills
+# (bench.synth.synth_events) through /events/batch, then drive each endpoint on its own
+# at --concurrency and report throughput, p50/p95/p99 latency, and SQL statements per
+# request (measured separately by bench.querycount). The response cache is off unless
+# --response-cache is given, so reads measure the database path.
+import argparse, json, os, subprocess, sys, tempfile, time, uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+from bench.async_load import KEY, ROOT, percentiles, start_server
+from bench.synth import synth_events
+
+ENDPOINTS = ("post_event", "bounties", "heatmap", "pirate_by_name")
+
+
+def seed(url: str, n_players: int, n_events: int, batch: int = 500):
+    events = synth_events(n_events, n_players)
+    s = requests.Session()
+    for i in range(0, len(events), batch):
+        s.post(f"{url}/api/v1/events/batch", json=events[i:i + batch],
+               headers={"X-API-Key": KEY}, timeout=120).raise_for_status()
+    # the busiest pirate, so /pirates/by-name hits a row with real history
+    return Counter(e["attacker_name"] for e in events).most_common(1)[0][0]
+
+
+def load(url: str, endpoint: str, pirate: str, n: int, concurrency: int):
+    s = requests.Session()
+    s.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=concurrency))
+    run = uuid.uuid4().hex[:6]
+    live = synth_events(n, 500, seed=int(run, 16)) if endpoint == "post_event" else None
+
+    def call(i):
+        if endpoint == "post_event":
+            return s.post(f"{url}/api/v1/events", json=live[i], headers={"X-API-Key": KEY}, timeout=60)
+        if endpoint == "bounties":
+            return s.get(f"{url}/api/v1/bounties", timeout=60)
+        if endpoint == "heatmap":
+            return s.get(f"{url}/api/v1/heatmap", timeout=60)
+        return s.get(f"{url}/api/v1/pirates/by-name", params={"name": pirate}, timeout=60)
+
+    def one(i):
+        t0 = time.perf_counter()
+        try:
+            ok = call(i).status_code < 400
+        except requests.RequestException:
+            ok = False
+        return time.perf_counter() - t0, ok
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as ex:
+        res = list(ex.map(one, range(n)))
+    wall = time.perf_counter() - t0
+    p50, p95, p99 = percentiles([d for d, _ in res])
+    return {"rps": n / wall, "p50": p50, "p95": p95, "p99": p99, "errors": sum(1 for _, ok in res if not ok)}
+
+
+def query_counts(env: dict, pirate: str) -> dict:
+    out = subprocess.run([sys.executable, "-m", "bench.querycount", pirate], cwd=ROOT,
+                         env=dict(os.environ, CLIENT_API_KEY=KEY, **env), capture_output=True, text=True)
+    if out.returncode != 0:
+        print(out.stderr[-2000:], file=sys.stderr)
+        return {}
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def run_database(label: str, db_url: str, args, port: int) -> dict:
+    env = {"DATABASE_URL": db_url, "ENRICH_WORKERS": "0"}
+    if not args.response_cache:
+        env["RESPONSE_CACHE_TTL"] = "0"
+    if args.async_db:
+        env["DB_ASYNC"] = "1"
+    proc, url = start_server(port, env)
+    try:
+        t0 = time.perf_counter()
+        pirate = seed(url, args.players, args.events)
+        print(f"[{label}] seeded {args.events} events / {args.players} players in {time.perf_counter() - t0:.1f}s")
+        results = {ep: load(url, ep, pirate, args.requests, args.concurrency) for ep in ENDPOINTS}
+    finally:
+        proc.terminate()
+        proc.wait(10)
+    for ep, q in query_counts(env, pirate).items():
+        results[ep]["queries"] = q
+    return results
+
+
+def report(results: dict, baseline: dict | None, tolerance: float) -> list[str]:
+    regressions = []
+    print(f"\n{'db':9} {'endpoint':15} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'q/req':>6} {'err':>4}  vs baseline")
+    for db, eps in results.items():
+        for ep, r in eps.items():
+            line = (f"{db:9} {ep:15} {r['rps']:8.0f} {r['p50']:8.1f} {r['p95']:8.1f} {r['p99']:8.1f} "
+                    f"{r.get('queries', float('nan')):6.1f} {r['errors']:4d}")
+            base = (baseline or {}).get(db, {}).get(ep)
+            if base:
+                d_rps = r["rps"] / base["rps"] - 1
+                d_p95 = r["p95"] / base["p95"] - 1 if base["p95"] else 0.0
+                line += f"  rps {d_rps:+.0%}  p95 {d_p95:+.0%}"
+                if d_rps < -tolerance:
+                    regressions.append(f"{db} {ep}: throughput {d_rps:+.0%}")
+                if d_p95 > tolerance:
+                    regressions.append(f"{db} {ep}: p95 {d_p95:+.0%}")
+                if r.get("queries", 0) > base.get("queries", float("inf")):
+                    regressions.append(f"{db} {ep}: {base['queries']:.1f} -> {r['queries']:.1f} queries/request")
+            print(line)
+    return regressions
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--sqlite", action=argparse.BooleanOptionalAction, default=True, help="run against a temp SQLite file")
+    ap.add_argument("--postgres", metavar="URL", help="also run against this (disposable) Postgres database")
+    ap.add_argument("--players", type=int, default=500)
+    ap.add_argument("--events", type=int, default=10_000)
+    ap.add_argument("-n", "--requests", type=int, default=1000, help="requests per endpoint")
+    ap.add_argument("-c", "--concurrency", type=int, default=32)
+    ap.add_argument("--async-db", action="store_true", help="serve with DB_ASYNC=1")
+    ap.add_argument("--response-cache", action="store_true", help="leave the ETag response cache on")
+    ap.add_argument("--baseline", type=Path, help="compare against this saved result file")
+    ap.add_argument("--save-baseline", type=Path, help="write results here")
+    ap.add_argument("--tolerance", type=float, default=0.20, help="allowed throughput/p95 change before flagging")
+    ap.add_argument("--port", type=int, default=8800)
+    args = ap.parse_args(argv)
+
+    targets = {}
+    if args.sqlite:
+        targets["sqlite"] = f"sqlite:///{tempfile.mkdtemp(prefix='pirate-suite-')}/bench.db"
+    if args.postgres:
+        targets["postgres"] = args.postgres
+    results = {label: run_database(label, url, args, args.port + i) for i, (label, url) in enumerate(targets.items())}
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else None
+    regressions = report(results, baseline, args.tolerance)
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+        print(f"\nsaved {args.save_baseline}")
+    for r in regressions:
+        print("REGRESSION", r)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+# bench/synth.py — synthetic Game.log / event generators shared by the benchmarks
+import random
+
+ZONES = ["Stanton", "Crusader", "Daymar", "Yela", "Cellin", "MicroTech", "Hurston", "ArcCorp"]
+DAMAGE_TYPES = ["VehicleDestruction", "Bullet", "Explosion", "Collision", "Crash"]
+WEAPONS = ["Size5Laser", "Size3Ballistic", "GATS_BallisticGatling_S3", "KLWE_LaserRepeater_S4"]
+
+NOISE_TEMPLATES = [
+    "<{ts}> [Notice] <Context Establisher Done> establisher=\"CReplicationModel\" runningTime={n}.{m} map=\"megamap\" gamerules=\"SC_Default\" [Team_Network][Network][Replication][Loading]",
+    "<{ts}> [Notice] <CEntityComponentInstancedInterior::OnEntityLeaveZone> [InstancedInterior] OnEntityLeaveZone - InstancedInterior [Hangar_{n}] [{m}] -> Entity [Player_{n}] [{m}] [Team_CGP2][Cargo]",
+    "<{ts}> [Notice] <Vehicle Control Flow> CVehicleMovementBase::SetDriver: Local client node [{n}] releasing control token for 'ANVL_Hornet_F7C_{m}' [{n}] [Team_VehicleFeatures][Vehicle]",
+    "<{ts}> [Notice] <[ActorState] Corpse> [ACTOR STATE][SSCActorStateCVars::IsCorpseEnabled] Player 'NPC_{n}' <local client>: Running corpsify check. [Team_ActorTech][Actor]",
+    "<{ts}> [Trace] <SHUDEvent_OnNotification> Added notification \"Entered Monitored Space\" [{n}] to queue. New queue size: {m}",
+    "<{ts}> [Notice] <Spawn Flow> CSCPlayerPUSpawningComponent::UnregisterFromExternalSystems: Player 'Member{n}' [{m}] lost reservation for spawnpoint [Team_ActorTech][Player]",
+    "<{ts}> Loading screen for pu : SC_Frontend closed after {n}.{m} seconds",
+]
+
+KILL_TEMPLATE = (
+    "<{ts}> [Notice] <Actor Death> CActor::Kill: '{victim}' [{victim_id}] in zone '{zone}' "
+    "killed by {attacker}{org} [{attacker_id}] using '{weapon}' with damage type '{damage}' "
+    "x: {x:.2f}, y: {y:.2f}, z: {z:.2f}"
+)
+
+
+def player_pool(rng: random.Random, n: int, prefix: str) -> list[str]:
+    return [f"{prefix}{i:04d}" for i in range(n)]
+
+
+def zipf_choice(rng: random.Random, items: list, s: float = 1.2):
+    """Skewed pick: a few hot pirates/zones account for most kills, like real logs."""
+    weights = [1.0 / (i + 1) ** s for i in range(len(items))]
+    return rng.choices(items, weights=weights, k=1)[0]
+
+
+def _ts(rng: random.Random, i: int) -> str:
+    sec = i // 10
+    return f"2949-09-{23 + sec // 86400 % 5:02d} {sec // 3600 % 24:02d}:{sec // 60 % 60:02d}:{sec % 60:02d}.{rng.randrange(1000):03d}"
+
+
+def kill_line(rng: random.Random, i: int, pirates: list[str], members: list[str], orgs: list[str]) -> str:
+    org = zipf_choice(rng, orgs)
+    return KILL_TEMPLATE.format(
+        ts=_ts(rng, i),
+        victim=rng.choice(members),
+        victim_id=rng.randrange(10**5, 10**6),
+        zone=zipf_choice(rng, ZONES),
+        attacker=zipf_choice(rng, pirates),
+        org=f" ({org})" if org else "",
+        attacker_id=rng.randrange(10**5, 10**6),
+        weapon=rng.choice(WEAPONS),
+        damage=rng.choice(DAMAGE_TYPES),
+        x=rng.uniform(-20000, 20000), y=rng.uniform(-20000, 20000), z=rng.uniform(-5000, 5000),
+    )
+
+
+def synth_game_log(n_lines: int, kill_ratio: float = 0.002, seed: int = 1,
+                   n_pirates: int = 200, n_members: int = 50) -> list[str]:
+    """Game.log-shaped lines: mostly engine noise with the occasional Actor Death notice."""
+    rng = random.Random(seed)
+    pirates = player_pool(rng, n_pirates, "Pirate")
+    members = player_pool(rng, n_members, "Member")
+    orgs = ["Harassers", "REDSCAR", "XENO", "BLKSAIL", None]
+    out = []
+    for i in range(n_lines):
+        if rng.random() < kill_ratio:
+            out.append(kill_line(rng, i, pirates, members, orgs))
+        else:
+            out.append(rng.choice(NOISE_TEMPLATES).format(ts=_ts(rng, i), n=rng.randrange(10**4), m=rng.randrange(10**3)))
+    return out
+
+
+def synth_events(n_events: int, n_players: int = 500, seed: int = 1, days: int = 30,
+                 end=None) -> list[dict]:
+    """EventCreate payloads with log-like skew: a zipf head of pirates does most of the
+    killing, each pirate keeps one org, and kills cluster around a few hot bodies."""
+    from datetime import datetime, timedelta
+    from backend.services.bodies import BODIES
+    rng = random.Random(seed)
+    n_pirates = max(1, n_players // 5)
+    pirates = player_pool(rng, n_pirates, "Pirate")
+    members = player_pool(rng, max(1, n_players - n_pirates), "Member")
+    orgs = ["Harassers", "REDSCAR", "XENO", "BLKSAIL", "VOIDRUN", None, None]
+    pirate_org = {p: zipf_choice(rng, orgs, 0.8) for p in pirates}
+    bodies = list(BODIES.values())
+    end = end or datetime.utcnow()
+    out = []
+    for i in range(n_events):
+        attacker = zipf_choice(rng, pirates)
+        bx, by, bz = zipf_choice(rng, bodies)
+        when = end - timedelta(seconds=rng.uniform(0, days * 86400))
+        out.append({
+            "timestamp": when.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z",
+            "attacker_name": attacker, "attacker_org": pirate_org[attacker],
+            "victim_name": rng.choice(members), "zone": zipf_choice(rng, ZONES),
+            "coords": {"x": bx + rng.gauss(0, 800), "y": by + rng.gauss(0, 800), "z": bz + rng.gauss(0, 300)},
+            "weapon": rng.choice(WEAPONS), "damage_type": rng.choice(DAMAGE_TYPES),
+            "ship_value_estimate": round(rng.lognormvariate(11, 1.2), 2),
+        })
+    return out
@@ -2,5 +2,15 @@ from pirate_watcher.watcher import run_watcher
 import argparse
 parser = argparse.ArgumentParser(description="Pirate watcher")
 parser.add_argument("--log", help="Path to Game.log", required=False)
+parser.add_argument("--backfill", nargs="+", metavar="PATH", help="Upload kills from old Game.log files/dirs, then exit")
+parser.add_argument("--workers", type=int, default=None, help="Backfill parser processes (default: CPU count)")
+parser.add_argument("--batch-size", type=int, default=200, help="Backfill events per upload")
+parser.add_argument("--checkpoint", default=".pirate_backfill.json", help="Backfill resume file")
+parser.add_argument("--dry-run", action="store_true", help="Backfill: parse and filter but do not upload")
 args = parser.parse_args()
-run_watcher(args.log)
+if args.backfill:
+    from pirate_watcher.backfill import run_backfill
+    run_backfill(args.backfill, workers=args.workers, batch_size=args.batch_size,
+                 checkpoint=args.checkpoint, dry_run=args.dry_run)
+else:
+    run_watcher(args.log)
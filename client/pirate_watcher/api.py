@@ -1,21 +1,90 @@
-import requests, os
+import gzip, json, os, threading, time
+from collections import defaultdict, deque
+import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 load_dotenv()
 BACKEND_URL = os.getenv('BACKEND_URL','http://127.0.0.1:8000')
 CLIENT_API_KEY = os.getenv('CLIENT_API_KEY','change-me-client')
+CONNECT_TIMEOUT = float(os.getenv('CONNECT_TIMEOUT', '5'))
+READ_TIMEOUT = float(os.getenv('READ_TIMEOUT', '30'))
+GZIP_MIN_BYTES = int(os.getenv('GZIP_MIN_BYTES', '1024'))
+
+_session = None
+_session_lock = threading.Lock()
+
+def session() -> requests.Session:
+    """Shared keep-alive session so submissions reuse one TCP/TLS connection."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                s = requests.Session()
+                adapter = HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=0)
+                s.mount('http://', adapter)
+                s.mount('https://', adapter)
+                s.headers.update({'Accept-Encoding': 'gzip', 'Connection': 'keep-alive'})
+                _session = s
+    return _session
+
+# ---- per-call latency stats ----
+_latency = defaultdict(lambda: deque(maxlen=500))
+_errors = defaultdict(int)
+
+def _record(name: str, started: float, ok: bool):
+    _latency[name].append(time.perf_counter() - started)
+    if not ok:
+        _errors[name] += 1
+
+def latency_stats() -> dict:
+    """{call: {count, errors, p50_ms, p95_ms, max_ms}} over the last 500 calls of each kind."""
+    out = {}
+    for name, samples in list(_latency.items()):
+        xs = sorted(samples)
+        if not xs:
+            continue
+        out[name] = {
+            'count': len(xs),
+            'errors': _errors[name],
+            'p50_ms': round(xs[len(xs) // 2] * 1000, 1),
+            'p95_ms': round(xs[min(len(xs) - 1, int(len(xs) * 0.95))] * 1000, 1),
+            'max_ms': round(xs[-1] * 1000, 1),
+        }
+    return out
+
+def _post_json(name: str, path: str, body):
+    headers = {"X-API-Key": CLIENT_API_KEY, "Content-Type": "application/json"}
+    data = json.dumps(body, separators=(',', ':')).encode('utf-8')
+    if len(data) >= GZIP_MIN_BYTES:
+        data = gzip.compress(data, compresslevel=5)
+        headers["Content-Encoding"] = "gzip"
+    t0 = time.perf_counter()
+    ok = False
+    try:
+        r = session().post(f"{BACKEND_URL}{path}", data=data, headers=headers, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+        r.raise_for_status()
+        ok = True
+        return r.json()
+    finally:
+        _record(name, t0, ok)
 
 def post_event(payload: dict):
-    url = f"{BACKEND_URL}/api/v1/events"
-    headers = {"X-API-Key": CLIENT_API_KEY}
-    r = requests.post(url, json=payload, headers=headers, timeout=10)
-    r.raise_for_status()
-    return r.json()
+    return _post_json('post_event', '/api/v1/events', payload)
+
+def post_events(payloads: list[dict]):
+    """Submit many events in one request; returns {'inserted', 'failed', 'results': [...]}."""
+    return _post_json('post_events', '/api/v1/events/batch', payloads)
 
 def get_roster():
     url = f"{BACKEND_URL}/api/v1/roster"
+    t0 = time.perf_counter()
+    ok = False
     try:
-        r = requests.get(url, timeout=5)
+        r = session().get(url, timeout=(CONNECT_TIMEOUT, 5))
         r.raise_for_status()
+        ok = True
         return r.json().get('roster', [])
     except Exception:
         return []
+    finally:
+        _record('get_roster', t0, ok)
@@ -0,0 +1,156 @@
+import gzip, json, os, random, time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, List, Tuple
+
+from .parser import parse_lines
+from .api import post_events
+from .watcher import load_roster, is_pirate_attack, to_payload
+
+CHUNK_BYTES = 8 * 1024 * 1024
+LOG_SUFFIXES = ('.log', '.log.gz', '.txt')
+POST_ATTEMPTS = int(os.getenv('BACKFILL_POST_ATTEMPTS', '6'))
+BACKOFF_MAX = 60.0
+
+
+def discover(paths: Iterable[str]) -> List[Path]:
+    """Expand files/dirs into log files, oldest first so events are uploaded in time order."""
+    found = []
+    for p in map(Path, paths):
+        if p.is_dir():
+            found.extend(f for f in p.rglob('*') if f.is_file() and f.name.lower().endswith(LOG_SUFFIXES))
+        elif p.is_file():
+            found.append(p)
+        else:
+            print('Backfill: skipping missing path', p)
+    return sorted({f.resolve() for f in found}, key=lambda f: (f.stat().st_mtime, str(f)))
+
+
+# ---- checkpoint: {abs_path: {"offset": bytes_done, "size": size_when_done}} ----
+def load_checkpoint(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def save_checkpoint(path: Path, state: dict):
+    tmp = path.with_suffix(path.suffix + '.tmp')
+    tmp.write_text(json.dumps(state, indent=1))
+    os.replace(tmp, path)  # atomic, so an interrupted run never leaves a torn checkpoint
+
+
+def plan_chunks(f: Path, start: int) -> List[Tuple[str, int, int]]:
+    size = f.stat().st_size
+    if f.name.endswith('.gz'):
+        # gzip cannot be split by offset: one all-or-nothing unit
+        return [] if start >= size else [(str(f), 0, size)]
+    return [(str(f), s, min(s + CHUNK_BYTES, size)) for s in range(start, size, CHUNK_BYTES)]
+
+
+def parse_chunk(task: Tuple[str, int, int]) -> Tuple[str, int, list]:
+    """Worker: parse the lines that *start* in [start, end) and return (path, end, events)."""
+    path, start, end = task
+    if path.endswith('.gz'):
+        with gzip.open(path, 'rt', encoding='utf-8', errors='ignore') as f:
+            return path, end, list(parse_lines(f))
+    lines = []
+    with open(path, 'rb') as f:
+        if start:
+            f.seek(start - 1)
+            f.readline()  # skip the tail of a line owned by the previous chunk
+        while f.tell() < end:
+            raw = f.readline()
+            if not raw:
+                break
+            lines.append(raw.decode('utf-8', errors='ignore'))
+    return path, end, list(parse_lines(lines))
+
+
+def post_with_retry(batch: list, attempts: int = POST_ATTEMPTS):
+    """post_events with jittered exponential backoff; re-raises after the last attempt.
+
+    A retry after a lost response is safe: every payload carries an event_key and
+    the server acknowledges already-stored events without counting them again.
+    """
+    delay = 1.0
+    for attempt in range(1, attempts + 1):
+        try:
+            return post_events(batch)
+        except Exception as e:
+            if attempt == attempts:
+                raise
+            wait = delay * random.uniform(0.5, 1.0)
+            print(f'Backfill: upload failed ({e}); retry {attempt}/{attempts - 1} in {wait:.0f}s')
+            time.sleep(wait)
+            delay = min(delay * 2, BACKOFF_MAX)
+
+
+def run_backfill(paths: Iterable[str], workers: int = None, batch_size: int = 200,
+                 checkpoint: str = '.pirate_backfill.json', dry_run: bool = False) -> int:
+    roster = set(load_roster())
+    if not roster:
+        print('Backfill: no roster (set ORG_ROSTER or FETCH_ROSTER=1); nothing would match.')
+        return 0
+
+    ckpt_path = Path(checkpoint)
+    state = load_checkpoint(ckpt_path)
+    tasks = []
+    for f in discover(paths):
+        done = state.get(str(f), {}).get('offset', 0)
+        if done > f.stat().st_size:
+            done = 0  # file was replaced/truncated since the last run
+        tasks.extend(plan_chunks(f, done))
+    if not tasks:
+        print('Backfill: nothing to do (all files checkpointed).')
+        return 0
+    print(f'Backfill: {len(tasks)} chunks, {workers or os.cpu_count()} workers')
+
+    seen = set()
+    pending: list = []
+    uploaded = 0
+    # (len(pending) at a chunk boundary, path, chunk end): that offset is checkpointed
+    # as soon as the batch containing the chunk's last event is acknowledged
+    marks: list = []
+    t0 = time.monotonic()
+
+    def checkpoint(upto: int):
+        while marks and marks[0][0] <= upto:
+            _, p, off = marks.pop(0)
+            state[p] = {'offset': off, 'size': os.path.getsize(p)}
+        save_checkpoint(ckpt_path, state)
+
+    def flush():
+        nonlocal pending, uploaded
+        done = 0
+        while done < len(pending):
+            batch = pending[done:done + batch_size]
+            if dry_run:
+                uploaded += len(batch)
+            else:
+                resp = post_with_retry(batch)
+                uploaded += resp.get('inserted', 0)
+                if resp.get('failed'):
+                    print('Backfill: server rejected', resp['failed'], 'events')
+            done += len(batch)
+            checkpoint(done)
+        checkpoint(done)  # chunk boundaries with no events after them
+        pending = []
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # map() yields in submission order, so per-file offsets only ever advance contiguously
+        for path, end, events in pool.map(parse_chunk, tasks):
+            for data in events:
+                if not is_pirate_attack(data, roster):
+                    continue
+                key = (data['timestamp'], data['attacker_name'], data['victim_name'])
+                if key in seen:
+                    continue
+                seen.add(key)
+                pending.append(to_payload(data))
+            # only flush on chunk boundaries so a checkpointed offset never covers unsent events
+            marks.append((len(pending), path, end))
+            if not pending or len(pending) >= batch_size:
+                flush()
+    flush()
+    print(f'Backfill: {uploaded} events uploaded in {time.monotonic() - t0:.1f}s')
+    return uploaded
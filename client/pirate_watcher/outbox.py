@@ -0,0 +1,145 @@
+import json, os, random, sqlite3, threading, time
+from pathlib import Path
+
+import requests
+
+from .api import post_events, latency_stats
+
+OUTBOX_PATH = os.getenv('OUTBOX_PATH', str(Path.home() / '.pirate_watcher' / 'outbox.db'))
+BATCH_SIZE = int(os.getenv('OUTBOX_BATCH', '100'))
+BACKOFF_MIN = 1.0
+BACKOFF_MAX = 300.0
+# a row the server rejected this many times goes to the dead_letter table instead of blocking the queue
+MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', '5'))
+# statuses that mean "this payload", not "the server is down"; every 5xx, timeout and refused
+# connection stays on the retry/backoff path, since the batch endpoint answers 500 for a DB outage too
+REJECT_STATUSES = {400, 413, 422}
+
+
+class Outbox:
+    """Append-only on-disk queue of event payloads, drained by a background sender.
+
+    The tail loop only ever does a local INSERT; delivery, batching and retries
+    happen on the sender thread, so a sleeping or restarting backend never stalls
+    tailing and nothing is lost across process restarts.
+
+    Delivery is at-least-once; every payload carries an event_key the server
+    dedupes on, so a resend after a lost response is not counted twice. When the
+    server rejects a batch, its rows are retried one at a time and a row that is
+    still rejected after MAX_ATTEMPTS is moved to the dead_letter table.
+    """
+
+    def __init__(self, path: str = OUTBOX_PATH, batch_size: int = BATCH_SIZE, send=post_events):
+        self.path = path
+        self.batch_size = batch_size
+        self.send = send
+        self.sent = 0
+        self.rejected = 0
+        self.dead = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = self._connect()  # writer connection, owned by the tail thread
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS outbox ('
+            ' id INTEGER PRIMARY KEY AUTOINCREMENT,'
+            ' payload TEXT NOT NULL,'
+            ' created REAL NOT NULL,'
+            ' attempts INTEGER NOT NULL DEFAULT 0)'
+        )
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS dead_letter ('
+            ' id INTEGER PRIMARY KEY,'
+            ' payload TEXT NOT NULL,'
+            ' created REAL NOT NULL,'
+            ' attempts INTEGER NOT NULL,'
+            ' error TEXT,'
+            ' failed_at REAL NOT NULL)'
+        )
+        self._db.commit()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    # ---- producer side ----
+    def put(self, payload: dict):
+        self._db.execute('INSERT INTO outbox (payload, created) VALUES (?, ?)', (json.dumps(payload), time.time()))
+        self._db.commit()
+        self._wake.set()
+
+    def pending(self) -> int:
+        return self._db.execute('SELECT COUNT(*) FROM outbox').fetchone()[0]
+
+    def dead_letters(self) -> int:
+        return self._db.execute('SELECT COUNT(*) FROM dead_letter').fetchone()[0]
+
+    # ---- sender side ----
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='outbox-sender', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        db = self._connect()
+        backoff = BACKOFF_MIN
+        while not self._stop.is_set():
+            head = db.execute('SELECT attempts FROM outbox ORDER BY id LIMIT 1').fetchone()
+            if head is None:
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            # after a rejected batch, isolate the bad row by sending the rest one at a time
+            limit = 1 if head[0] else self.batch_size
+            rows = db.execute('SELECT id, payload, attempts FROM outbox ORDER BY id LIMIT ?', (limit,)).fetchall()
+            ids = [r[0] for r in rows]
+            try:
+                resp = self.send([json.loads(r[1]) for r in rows])
+            except Exception as e:
+                status = e.response.status_code if isinstance(e, requests.HTTPError) and e.response is not None else None
+                if status in REJECT_STATUSES:
+                    marks = ','.join('?' * len(ids))
+                    db.execute(f'UPDATE outbox SET attempts = attempts + 1 WHERE id IN ({marks})', ids)
+                    if len(rows) == 1 and rows[0][2] + 1 >= MAX_ATTEMPTS:
+                        self._bury(db, rows[0], f'HTTP {status}')
+                        db.commit()
+                        continue
+                    db.commit()
+                delay = backoff * random.uniform(0.5, 1.0)
+                print(f'Outbox: send failed ({e}); {len(rows)} queued, retrying in {delay:.0f}s')
+                backoff = min(backoff * 2, BACKOFF_MAX)
+                self._stop.wait(delay)
+                continue
+            backoff = BACKOFF_MIN
+            for item in resp.get('results', []):
+                if item.get('error') and item.get('index', -1) < len(rows):
+                    # the server will never accept it as-is; keep it aside rather than block the queue
+                    self.rejected += 1
+                    self._bury(db, rows[item['index']], item['error'])
+            self.sent += resp.get('inserted', 0)
+            db.execute('DELETE FROM outbox WHERE id <= ?', (ids[-1],))
+            db.commit()
+            lat = latency_stats().get('post_events', {})
+            dup = f", {resp['duplicates']} already stored" if resp.get('duplicates') else ''
+            print(f"Outbox: submitted {resp.get('inserted', 0)} events{dup} ({self.sent} total;"
+                  f" p50 {lat.get('p50_ms', '?')} ms, p95 {lat.get('p95_ms', '?')} ms)")
+        db.close()
+
+    def _bury(self, db, row, error: str):
+        row_id, payload, attempts = row
+        created = db.execute('SELECT created FROM outbox WHERE id = ?', (row_id,)).fetchone()[0]
+        db.execute('INSERT INTO dead_letter (id, payload, created, attempts, error, failed_at) VALUES (?, ?, ?, ?, ?, ?)',
+                   (row_id, payload, created, attempts + 1, error, time.time()))
+        db.execute('DELETE FROM outbox WHERE id = ?', (row_id,))
+        self.dead += 1
+        print(f'Outbox: event {row_id} rejected {attempts + 1} times ({error}); moved to dead_letter')
@@ -1,7 +1,20 @@
 \
 import re
-from typing import Optional, Dict
+from typing import Optional, Dict, Iterable, Iterator
 
+# Cheap substring gate: nearly every Game.log line is not a kill notice. Matched against the
+# lowercased line, since the patterns below (like the reference LINE_RE) ignore case.
+KILL_MARKER = "actor death"
+
+# Tight, non-backtracking pieces for the kill format; each search resumes where the last stopped.
+HEAD_RE = re.compile(
+    r"<(?P<ts>[^>]+)>\s*\[Notice\]\s*<Actor Death>\s*CActor::Kill:\s*'(?P<victim>[^']+)'\s*\[(?P<victim_id>\d+)\]\s*in zone\s*'(?P<zone>[^']+)'\s*killed by\s*(?P<attacker_part>[^\[]+?)\s*\[(?P<attacker_id>\d+)\]",
+    re.IGNORECASE
+)
+DAMAGE_RE = re.compile(r"damage type\s*'(?P<damage>[^']+)'", re.IGNORECASE)
+COORD_RE = re.compile(r"x:\s*(?P<x>-?\d+(?:\.\d+)?),\s*y:\s*(?P<y>-?\d+(?:\.\d+)?),\s*z:\s*(?P<z>-?\d+(?:\.\d+)?)", re.IGNORECASE)
+
+# Original single-pass pattern; kept as the reference the benchmark checks the fast path against.
 LINE_RE = re.compile(
     r"<(?P<ts>[^>]+)>\s*\[Notice\]\s*<Actor Death>\s*CActor::Kill:\s*'(?P<victim>[^']+)'\s*\[(?P<victim_id>\d+)\]\s*in zone\s*'(?P<zone>[^']+)'\s*killed by\s*(?P<attacker_part>[^\[]+?)\s*\[(?P<attacker_id>\d+)\].*?damage type\s*'(?P<damage>[^']+)'.*?x:\s*(?P<x>-?\d+(?:\.\d+)?),\s*y:\s*(?P<y>-?\d+(?:\.\d+)?),\s*z:\s*(?P<z>-?\d+(?:\.\d+)?)",
     re.IGNORECASE
@@ -18,11 +31,27 @@ def _split_attacker(part: str):
             return part, None
     return part, None
 
-def parse_line(line: str) -> Optional[Dict]:
-    m = LINE_RE.search(line)
+def _fast_groups(line: str) -> Optional[Dict]:
+    m = HEAD_RE.search(line)
     if not m:
         return None
+    d = DAMAGE_RE.search(line, m.end())
+    if not d:
+        return None
+    c = COORD_RE.search(line, d.end())
+    if not c:
+        return None
     gd = m.groupdict()
+    gd.update(d.groupdict())
+    gd.update(c.groupdict())
+    return gd
+
+def parse_line(line: str) -> Optional[Dict]:
+    if KILL_MARKER not in line.lower():
+        return None
+    gd = _fast_groups(line)
+    if gd is None:
+        return None
     attacker_name_raw = gd.get('attacker_part','').strip()
     attacker_name, attacker_org = _split_attacker(attacker_name_raw)
     return {
@@ -38,3 +67,11 @@ def parse_line(line: str) -> Optional[Dict]:
         "coords": {"x": float(gd["x"]), "y": float(gd["y"]), "z": float(gd["z"])},
         "source_line": line.strip(),
     }
+
+def parse_lines(lines: Iterable[str]) -> Iterator[Dict]:
+    """Parse many lines, yielding only the kill events."""
+    for line in lines:
+        if KILL_MARKER in line.lower():
+            data = parse_line(line)
+            if data:
+                yield data
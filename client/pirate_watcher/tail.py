@@ -0,0 +1,152 @@
+import os, time, threading
+from pathlib import Path
+from typing import Iterator, Optional
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except Exception:  # watchdog missing or no native backend -> polling only
+    Observer = None
+    FileSystemEventHandler = object
+
+CHUNK_SIZE = 64 * 1024
+
+
+class _ChangeHandler(FileSystemEventHandler):
+    def __init__(self, path: Path, wake: threading.Event):
+        self.path = os.path.normcase(str(path.resolve()))
+        self.wake = wake
+
+    def _matches(self, p) -> bool:
+        try:
+            return os.path.normcase(os.path.abspath(os.fsdecode(p))) == self.path
+        except Exception:
+            return False
+
+    def on_any_event(self, event):
+        if self._matches(event.src_path) or self._matches(getattr(event, "dest_path", "") or ""):
+            self.wake.set()
+
+
+class LogTailer:
+    """Follow a growing log file without busy-polling.
+
+    Sleeps until the OS reports a change (inotify/FSEvents/ReadDirectoryChangesW via
+    watchdog), or falls back to a slow stat() poll. New data is read in large chunks
+    and split into lines; a new inode or a shrinking file is treated as a rotation /
+    truncation and reading restarts from the top of the new file.
+    """
+
+    def __init__(self, path, from_start: bool = False, poll_interval: float = 1.0,
+                 stats_interval: float = 60.0, chunk_size: int = CHUNK_SIZE):
+        self.path = Path(path)
+        self.from_start = from_start
+        self.poll_interval = poll_interval
+        self.stats_interval = stats_interval
+        self.chunk_size = chunk_size
+        self.lines_total = 0
+        self.bytes_total = 0
+        self.rotations = 0
+        self._wake = threading.Event()
+        self._observer = None
+        self._f = None
+        self._ino = None
+        self._pos = 0
+        self._buf = b""
+        self._window_start = time.monotonic()
+        self._window_lines = 0
+        self.lines_per_sec = 0.0
+
+    # ---- lifecycle ----
+    def _start_observer(self):
+        if Observer is None:
+            return
+        try:
+            obs = Observer()
+            obs.schedule(_ChangeHandler(self.path, self._wake), str(self.path.parent), recursive=False)
+            obs.daemon = True
+            obs.start()
+            self._observer = obs
+        except Exception as e:
+            print('File notifications unavailable, polling instead:', e)
+            self._observer = None
+
+    def _open(self, at_end: bool):
+        if self._f:
+            self._f.close()
+        self._f = self.path.open('rb')
+        st = os.fstat(self._f.fileno())
+        self._ino = (st.st_dev, st.st_ino)
+        self._pos = st.st_size if at_end else 0
+        self._f.seek(self._pos)
+        self._buf = b""
+
+    def close(self):
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
+        if self._f:
+            self._f.close()
+            self._f = None
+
+    # ---- reading ----
+    def _check_rotation(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return  # mid-rotation; keep the old handle until the new file appears
+        if (st.st_dev, st.st_ino) != self._ino:
+            self.rotations += 1
+            print('Log replaced, reopening:', self.path)
+            self._open(at_end=False)
+        elif st.st_size < self._pos:
+            self.rotations += 1
+            print('Log truncated, restarting from top:', self.path)
+            self._f.seek(0)
+            self._pos = 0
+            self._buf = b""
+
+    def _drain(self) -> list:
+        out = []
+        while True:
+            chunk = self._f.read(self.chunk_size)
+            if not chunk:
+                break
+            self._pos += len(chunk)
+            self.bytes_total += len(chunk)
+            data = self._buf + chunk
+            parts = data.split(b"\n")
+            self._buf = parts.pop()  # trailing partial line waits for the next chunk
+            out.extend(p.decode('utf-8', errors='ignore') for p in parts)
+        return out
+
+    def _tick_stats(self, n: int):
+        self.lines_total += n
+        self._window_lines += n
+        now = time.monotonic()
+        elapsed = now - self._window_start
+        if elapsed >= self.stats_interval:
+            self.lines_per_sec = self._window_lines / elapsed
+            print(f'Tail: {self.lines_per_sec:.1f} lines/s ({self.lines_total} total, {self.rotations} rotations)')
+            self._window_start = now
+            self._window_lines = 0
+
+    def lines(self) -> Iterator[str]:
+        """Yield complete lines forever (until close())."""
+        self._start_observer()
+        self._open(at_end=not self.from_start)
+        # with notifications the timeout is only a safety net for missed events
+        timeout = self.poll_interval * (5 if self._observer is not None else 1)
+        try:
+            while True:
+                batch = self._drain()
+                if batch:
+                    self._tick_stats(len(batch))
+                    yield from batch
+                    continue
+                self._tick_stats(0)
+                self._wake.wait(timeout)
+                self._wake.clear()
+                self._check_rotation()
+        finally:
+            self.close()
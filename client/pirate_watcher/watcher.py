@@ -1,20 +1,16 @@
-import time, os
+import hashlib, os
 from pathlib import Path
 from collections import deque
 from .parser import parse_line
-from .api import post_event, get_roster
+from .tail import LogTailer
+from .api import get_roster
+from .outbox import Outbox
 from dotenv import load_dotenv
 load_dotenv()
 
 ORG_ROSTER = set([s.strip() for s in os.getenv('ORG_ROSTER','').split(',') if s.strip()])
 
-def run_watcher(log_path: str = None):
-    path = Path(log_path or os.getenv('LOG_PATH', ''))
-    if not path.exists():
-        print('Log path not found:', path)
-        return
-    print('Watching:', path)
-
+def load_roster():
     if os.getenv('FETCH_ROSTER','1') == '1':
         try:
             roster = get_roster()
@@ -24,37 +20,61 @@ def run_watcher(log_path: str = None):
                 ORG_ROSTER.update(roster)
         except Exception as e:
             print('Roster fetch failed:', e)
+    return ORG_ROSTER
+
+def is_pirate_attack(data: dict, roster=None) -> bool:
+    """An org member killed by someone outside the org."""
+    roster = ORG_ROSTER if roster is None else roster
+    return bool(roster) and (data['victim_name'] in roster) and (data['attacker_name'] not in roster)
+
+def event_key(data: dict) -> str:
+    """Stable id for one kill, the same from the live watcher and a backfill of the same log.
+
+    The server stores it with a unique index, so outbox resends and backfill reruns
+    are acknowledged without being counted twice."""
+    raw = '|'.join(str(data.get(k) or '') for k in ('timestamp', 'attacker_name', 'victim_name', 'damage_type'))
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:40]
+
+def to_payload(data: dict) -> dict:
+    return {
+        'timestamp': data['timestamp'],
+        'attacker_name': data['attacker_name'],
+        'attacker_id': data.get('attacker_id'),
+        'attacker_org': data.get('attacker_org'),
+        'victim_name': data['victim_name'],
+        'victim_id': data.get('victim_id'),
+        'zone': data['zone'],
+        'coords': data['coords'],
+        'weapon': data.get('weapon'),
+        'damage_type': data['damage_type'],
+        'ship_value_estimate': 0.0,
+        'source_line': data['source_line'],
+        'event_key': event_key(data),
+    }
+
+def run_watcher(log_path: str = None):
+    path = Path(log_path or os.getenv('LOG_PATH', ''))
+    if not path.exists():
+        print('Log path not found:', path)
+        return
+    print('Watching:', path)
+
+    load_roster()
+
+    outbox = Outbox().start()
+    backlog = outbox.pending()
+    if backlog:
+        print('Outbox: resuming with', backlog, 'unsent events')
 
     seen = deque(maxlen=200)
-    with path.open('r', encoding='utf-8', errors='ignore') as f:
-        f.seek(0,2)
-        while True:
-            line = f.readline()
-            if not line:
-                time.sleep(0.2); continue
-            data = parse_line(line)
-            if not data: continue
-            victim = data['victim_name']; attacker = data['attacker_name']
-            if ORG_ROSTER and (victim in ORG_ROSTER) and (attacker not in ORG_ROSTER):
-                key = (data['timestamp'], attacker, victim)
-                if key in seen: continue
-                seen.append(key)
-                payload = {
-                    'timestamp': data['timestamp'],
-                    'attacker_name': data['attacker_name'],
-                    'attacker_id': data.get('attacker_id'),
-                    'attacker_org': data.get('attacker_org'),
-                    'victim_name': data['victim_name'],
-                    'victim_id': data.get('victim_id'),
-                    'zone': data['zone'],
-                    'coords': data['coords'],
-                    'weapon': data.get('weapon'),
-                    'damage_type': data['damage_type'],
-                    'ship_value_estimate': 0.0,
-                    'source_line': data['source_line'],
-                }
-                try:
-                    resp = post_event(payload)
-                    print('Submitted event', resp.get('event_id'), '->', attacker, 'near', data['coords'])
-                except Exception as e:
-                    print('Submit failed:', e)
+    tailer = LogTailer(path, stats_interval=float(os.getenv('TAIL_STATS_INTERVAL', '60')))
+    for line in tailer.lines():
+        data = parse_line(line)
+        if not data: continue
+        victim = data['victim_name']; attacker = data['attacker_name']
+        if is_pirate_attack(data):
+            key = (data['timestamp'], attacker, victim)
+            if key in seen: continue
+            seen.append(key)
+            outbox.put(to_payload(data))
+            print('Queued event ->', attacker, 'near', data['coords'])
@@ -21,6 +21,7 @@ API_PREFIX     = os.getenv("API_PREFIX", "/api/v1").strip()
 GUILD_ID       = os.getenv("GUILD_ID")     # string ok
 OWNER_ID       = os.getenv("OWNER_ID")     # optional
 CLIENT_API_KEY = os.getenv("CLIENT_API_KEY", "").strip()
+ALERT_CHANNEL_ID = os.getenv("ALERT_CHANNEL_ID")  # optional: post live kill alerts here
 
 # auto-correct common typo
 if API_PREFIX.lower().rstrip("/") == "/api/vi":
@@ -39,13 +40,23 @@ bot = commands.Bot(command_prefix="!", intents=intents)
 session: aiohttp.ClientSession | None = None
 DEFAULT_TIMEOUT = aiohttp.ClientTimeout(total=20)
 
+# read cache: fresh for BOT_CACHE_TTL, then served stale (up to BOT_STALE_MAX) while the
+# backend is slow or down; BOT_REVALIDATE_WAIT is how long a command waits on a refresh
+BOT_CACHE_TTL       = float(os.getenv("BOT_CACHE_TTL", "30"))
+BOT_STALE_MAX       = float(os.getenv("BOT_STALE_MAX", "900"))
+BOT_REVALIDATE_WAIT = float(os.getenv("BOT_REVALIDATE_WAIT", "3"))
+
 # ---------- http helpers ----------
 def _full_url(path: str) -> str:
     # path should be like "/events" or "events"
     return f"{BACKEND_URL}{API_PREFIX}{path if path.startswith('/') else '/' + path}"
 
-async def http_get_json(path: str, timeout: aiohttp.ClientTimeout = DEFAULT_TIMEOUT):
-    """GET -> (json_or_text, err)"""
+async def http_get_json(path: str, timeout: aiohttp.ClientTimeout = DEFAULT_TIMEOUT,
+                        etag: str | None = None, meta: dict | None = None):
+    """GET -> (json_or_text, err)
+
+    With `etag`, the GET is conditional and a 304 Not Modified returns (None, None).
+    A `meta` dict passed in receives the response's ETag as meta["etag"]."""
     global session
     if not BACKEND_URL:
         return None, "Backend URL missing."
@@ -53,8 +64,13 @@ async def http_get_json(path: str, timeout: aiohttp.ClientTimeout = DEFAULT_TIME
         session = aiohttp.ClientSession(timeout=timeout)
 
     url = _full_url(path)
+    headers = {"If-None-Match": etag} if etag else {}
     try:
-        async with session.get(url) as resp:
+        async with session.get(url, headers=headers) as resp:
+            if meta is not None:
+                meta["etag"] = resp.headers.get("ETag")
+            if resp.status == 304:
+                return None, None
             if resp.status >= 400:
                 return None, f"{resp.status}: {(await resp.text())[:300]}"
             try:
@@ -98,6 +114,56 @@ async def http_post_json(path: str, payload: dict, use_client_key: bool = True,
     except Exception as e:
         return None, f"HTTP error: {e}"
 
+# ---------- cached reads ----------
+_cache: dict[str, tuple[float, object, str | None]] = {}   # path -> (fetched_at, data, etag)
+_inflight: dict[str, asyncio.Task] = {}
+cache_counts: dict[str, list[int]] = {}                      # command -> [hits, misses]
+
+async def _refresh(path: str):
+    """One backend round-trip per path at a time; updates the cache on success."""
+    try:
+        prev = _cache.get(path)
+        meta = {}
+        data, err = await http_get_json(path, etag=prev[2] if prev else None, meta=meta)
+        if err:
+            return None, err
+        if data is None and prev is not None:   # 304: keep the body we have
+            data = prev[1]
+        _cache[path] = (time.monotonic(), data, meta.get("etag") or (prev[2] if prev else None))
+        return data, None
+    finally:
+        _inflight.pop(path, None)
+
+async def cached_get_json(path: str, command: str = ""):
+    """GET through the shared cache -> (json_or_text, err, note).
+
+    Identical requests in flight are merged; when the backend is slow or failing,
+    a stale copy is returned and `note` says so."""
+    counts = cache_counts.setdefault(command or path, [0, 0])
+    now = time.monotonic()
+    entry = _cache.get(path)
+    if entry is not None and now - entry[0] < BOT_CACHE_TTL:
+        counts[0] += 1
+        return entry[1], None, "cached"
+
+    task = _inflight.get(path)
+    if task is None:
+        task = _inflight[path] = asyncio.create_task(_refresh(path))
+        counts[1] += 1
+    else:
+        counts[0] += 1
+    stale = entry if entry is not None and now - entry[0] < BOT_STALE_MAX else None
+    if stale is None:
+        data, err = await asyncio.shield(task)
+        return data, err, None
+    try:
+        data, err = await asyncio.wait_for(asyncio.shield(task), BOT_REVALIDATE_WAIT)
+    except asyncio.TimeoutError:
+        err = "backend slow"
+    if err:
+        return stale[1], None, f"stale {int(now - stale[0])}s, {err}"
+    return data, None, None
+
 # ---------- formatting helpers ----------
 def _extract_rows(payload, key_candidates=("hotspots","bounties","roster","data","items")):
     if payload is None:
@@ -176,6 +242,66 @@ def fmt_roster(payload):
         lines.append(f"...and {len(rows)-20} more.")
     return "\n".join(lines)
 
+# ---------- live alerts ----------
+_alert_task: asyncio.Task | None = None
+
+def fmt_alert(ev: dict) -> str:
+    org = f" [{ev['attacker_org']}]" if ev.get("attacker_org") else ""
+    return f"🏴‍☠️ **{ev.get('attacker_name', '?')}**{org} destroyed **{ev.get('victim_name', '?')}** near **{ev.get('zone', '?')}**"
+
+async def _alert_channel(channel_id: int):
+    """The alert channel, once the gateway is ready; fetched over REST if it isn't cached."""
+    await bot.wait_until_ready()
+    return bot.get_channel(channel_id) or await bot.fetch_channel(channel_id)
+
+async def stream_alerts(channel_id: int):
+    """Follow /events/stream (SSE) and post each new kill; reconnects with Last-Event-ID.
+
+    last_id only moves past an event once its alert was sent, so a failed send (or a
+    channel that can't be resolved yet) is replayed on the next connection, not lost.
+    """
+    last_id = None
+    delay = 1
+    send_failing = False  # keep backing off across reconnects while sends fail (e.g. missing permissions)
+    # no total timeout on a long-lived stream; the server pings every 15s
+    timeout = aiohttp.ClientTimeout(total=None, sock_read=60)
+    while True:
+        headers = {"X-API-Key": CLIENT_API_KEY}
+        if last_id is not None:
+            headers["Last-Event-ID"] = str(last_id)
+        try:
+            channel = await _alert_channel(channel_id)
+            async with aiohttp.ClientSession(timeout=timeout) as s:
+                async with s.get(_full_url("/events/stream"), headers=headers) as resp:
+                    if resp.status != 200:
+                        raise aiohttp.ClientError(f"stream returned {resp.status}")
+                    if not send_failing:
+                        delay = 1
+                    event_id, data = None, []
+                    async for raw in resp.content:
+                        line = raw.decode("utf-8").rstrip("\r\n")
+                        if line.startswith("id:"):
+                            event_id = line[3:].strip()
+                        elif line.startswith("data:"):
+                            data.append(line[5:].strip())
+                        elif not line and data:
+                            try:
+                                await channel.send(fmt_alert(json.loads("\n".join(data))))
+                            except Exception as e:
+                                # reconnect from the last delivered id so this alert is replayed
+                                send_failing = True
+                                raise RuntimeError(f"alert send failed: {e}") from e
+                            send_failing = False
+                            if event_id:
+                                last_id = event_id
+                            event_id, data = None, []
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Event stream disconnected: {e}; retrying in {delay}s")
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 60)
+
 # ---------- lifecycle ----------
 @bot.event
 async def on_ready():
@@ -183,6 +309,10 @@ async def on_ready():
     if session is None or session.closed:
         session = aiohttp.ClientSession(timeout=DEFAULT_TIMEOUT)
     print(f"✅ Bot ready as {bot.user}")
+    global _alert_task
+    if ALERT_CHANNEL_ID and BACKEND_URL and CLIENT_API_KEY and (_alert_task is None or _alert_task.done()):
+        # on_ready fires again after reconnects; keep a single subscription
+        _alert_task = asyncio.create_task(stream_alerts(int(ALERT_CHANNEL_ID)))
     try:
         if GUILD_ID:
             guild = discord.Object(id=int(GUILD_ID))
@@ -197,6 +327,8 @@ async def on_ready():
 
 @bot.event
 async def on_close():
+    if _alert_task and not _alert_task.done():
+        _alert_task.cancel()
     if session and not session.closed:
         await session.close()
 
@@ -270,7 +402,8 @@ async def health_cmd(inter: discord.Interaction):
 async def _send(inter: discord.Interaction, path: str, fmt_fn):
     await inter.response.defer(ephemeral=True)
     t0 = time.time()
-    data, err = await http_get_json(path)
+    command = inter.command.name if inter.command else path
+    data, err, note = await cached_get_json(path, command)
     if err:
         await inter.followup.send(f"⚠️ {err}")
         return
@@ -278,16 +411,22 @@ async def _send(inter: discord.Interaction, path: str, fmt_fn):
         msg = fmt_fn(data)
     except Exception as e:
         msg = f"⚠️ Format error: {e}"
-    await inter.followup.send(f"{msg}\n_(query {time.time()-t0:.1f}s)_")
+    hits, misses = cache_counts.get(command, (0, 0))
+    footer = f"query {time.time()-t0:.1f}s" + (f" · {note}" if note else "") + f" · cache {hits} hit / {misses} miss"
+    await inter.followup.send(f"{msg}\n_({footer})_")
 
 # ---------- commands ----------
+def _heatmap_path(days: int = 7) -> str:
+    since = (dt.datetime.utcnow() - dt.timedelta(days=days)).replace(minute=0, second=0, microsecond=0)
+    return f"/heatmap?since={quote_plus(since.isoformat() + 'Z')}"
+
 @bot.tree.command(name="heatmap", description="Show piracy hotspots")
 async def heatmap_cmd(inter: discord.Interaction):
-    await _send(inter, "/heatmap", fmt_hotspots)
+    await _send(inter, _heatmap_path(), fmt_hotspots)
 
 @bot.tree.command(name="hotspots", description="Alias for /heatmap")
 async def hotspots_cmd(inter: discord.Interaction):
-    await _send(inter, "/heatmap", fmt_hotspots)
+    await _send(inter, _heatmap_path(), fmt_hotspots)
 
 @bot.tree.command(name="bounties", description="Show top pirates")
 async def bounties_cmd(inter: discord.Interaction):
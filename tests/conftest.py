@@ -0,0 +1,15 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "client"))  # pirate_watcher
+
+# backend.database builds its engine at import time, so point it at a throwaway file first
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp(prefix='pirate-tests-')}/test.db")
+os.environ.setdefault("CLIENT_API_KEY", "test-client-key")
+os.environ.setdefault("ADMIN_API_KEY", "test-admin-key")
+os.environ.setdefault("RESPONSE_CACHE_TTL", "0")  # measure the endpoints, not cache hits
+os.environ.setdefault("ENRICH_WORKERS", "0")
@@ -0,0 +1,65 @@
+"""Schema setup and derived-table rebuilds agree with what ingest writes."""
+import tempfile
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from backend import migrations
+from backend.app import app
+from backend.database import Base, SessionLocal, engine
+from backend.migrations import ensure_schema, stamp_version
+from backend.models import HotspotRollup
+
+KEY = {"X-API-Key": "test-client-key"}
+ZONE = "TmZone"
+
+
+def _rollups():
+    db = SessionLocal()
+    try:
+        return sorted(db.query(HotspotRollup.granularity, HotspotRollup.bucket_start, HotspotRollup.body,
+                               HotspotRollup.event_count).filter(HotspotRollup.zone == ZONE))
+    finally:
+        db.close()
+
+
+def test_rollup_rebuild_matches_ingest():
+    Base.metadata.create_all(bind=engine)
+    stamp_version(engine)
+    batch = [{"timestamp": ts, "attacker_name": f"TmPirate{i}", "victim_name": "TmVictim", "zone": ZONE,
+              "coords": {"x": 0.0, "y": 0.0, "z": 0.0}, "damage_type": "VehicleDestruction"}
+             for i, ts in enumerate(["2949-09-23 14:05:00", "<no time>", "not a time either"])]
+    r = TestClient(app).post("/api/v1/events/batch", json=batch, headers=KEY)
+    assert r.status_code == 200 and r.json()["inserted"] == len(batch)
+    ingested = _rollups()
+    # unplaceable timestamps count at receive time rather than being dropped
+    assert sum(n for g, _, _, n in ingested if g == "hour") == len(batch)
+
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM hotspot_rollups"))
+    migrations._backfill_hotspot_rollups()
+    assert _rollups() == ingested
+
+
+@pytest.fixture
+def recorded_steps(monkeypatch):
+    ran = []
+    monkeypatch.setattr(migrations, "VERSION_STEPS", {2: [lambda: ran.append(2)]})
+    return ran
+
+
+def test_fresh_database_skips_repairs(recorded_steps):
+    fresh = create_engine(f"sqlite:///{tempfile.mkdtemp()}/fresh.db")
+    applied = ensure_schema(fresh)
+    assert recorded_steps == [] and "v2" not in applied
+    assert ensure_schema(fresh) is None
+
+
+def test_unversioned_database_runs_repairs(recorded_steps):
+    old = create_engine(f"sqlite:///{tempfile.mkdtemp()}/old.db")
+    Base.metadata.create_all(bind=old)  # tables from a build that predates schema_version
+    with old.begin() as conn:
+        conn.execute(text("DROP TABLE schema_version"))
+    applied = ensure_schema(old)
+    assert recorded_steps == [2] and "v2" in applied
@@ -0,0 +1,75 @@
+"""The prefiltered parser returns exactly what the original single-regex parser did."""
+from pathlib import Path
+
+from pirate_watcher import parser as P
+
+EXAMPLE_LOG = Path(__file__).resolve().parents[1] / "example_log.txt"
+
+
+def _reference_parse_line(line: str):
+    """parse_line as it was before the fast path: one LINE_RE search."""
+    m = P.LINE_RE.search(line)
+    if not m:
+        return None
+    gd = m.groupdict()
+    attacker_name, attacker_org = P._split_attacker(gd.get("attacker_part", "").strip())
+    return {
+        "timestamp": gd["ts"],
+        "victim_name": gd["victim"],
+        "victim_id": int(gd["victim_id"]),
+        "attacker_name": attacker_name,
+        "attacker_id": int(gd["attacker_id"]),
+        "attacker_org": attacker_org,
+        "zone": gd["zone"],
+        "weapon": None,
+        "damage_type": gd["damage"],
+        "coords": {"x": float(gd["x"]), "y": float(gd["y"]), "z": float(gd["z"])},
+        "source_line": line.strip(),
+    }
+
+
+KILL = ("<2024-03-02T21:14:09.482Z> [Notice] <Actor Death> CActor::Kill: 'PU_Human_Enemy_GroundCombat_NPC_Pirate_Guard"
+        "_2004812211934' [2004812211934] in zone 'OOC_Stanton_1b_Aberdeen' killed by 'Rexxar' [201990621236] using "
+        "'KSAR_Rifle_Energy_01_7002394811' [Class KSAR_Rifle_Energy_01] with damage type 'Bullet' from direction "
+        "x: 0.412, y: -0.876, z: 0.249 [Team_ActorTech][Actor]")
+
+LINES = EXAMPLE_LOG.read_text().splitlines(keepends=True) + [
+    KILL + "\n",
+    # the patterns ignore case, so case variants of the kill notice still parse
+    KILL.replace("<Actor Death>", "<actor death>"),
+    KILL.replace("[Notice] <Actor Death> CActor::Kill", "[NOTICE] <ACTOR DEATH> CACTOR::KILL"),
+    KILL.replace("x: 0.412, y: -0.876, z: 0.249", "X: 0.412, Y: -0.876, Z: 0.249"),
+    KILL.replace("damage type", "Damage Type"),
+    # not [Notice] lines: never parsed
+    KILL.replace("[Notice]", "[Trace]"),
+    KILL.replace("[Notice] ", ""),
+    KILL.replace("[Notice]", "[Notice] <Vehicle Destruction>"),
+    # kill notices missing a part
+    KILL.split(" with damage type")[0],
+    KILL.split(" from direction")[0],
+    "<2024-03-02T21:14:09.482Z> [Notice] <Actor Death> CActor::Kill: malformed",
+    # everyday Game.log noise, some of it mentioning death
+    "<2024-03-02T21:14:09.511Z> [Notice] <[ActorState] Dead> [ACTOR STATE][SSCActorStateCVars::IsCorpseEnabled] "
+    "Player 'Rexxar' <local client>: Running corpsify check. [Team_ActorTech][Actor]",
+    "<2024-03-02T21:14:10.003Z> [Notice] <Vehicle Destruction> CVehicle::OnAdvanceDestroyLevel: Vehicle "
+    "'ANVL_Hornet_F7C_7002394811' [7002394811] in zone 'Stanton1' [pos x: -18962.51, y: -2664.99, z: -3.31] driven by "
+    "'Rexxar' [201990621236] advanced from destroy level 0 to 1 caused by 'Nova' [201990633390] with 'Combat' "
+    "[Team_VehicleFeatures][Vehicle]",
+    "<2024-03-02T21:14:12.120Z> [Trace] <SHUDEvent_OnNotification> Added notification \"Actor death recorded\" [42]",
+    "<2024-03-02T21:14:13.870Z> Loading screen for pu : SC_Frontend closed after 14.22 seconds\n",
+    "",
+]
+
+
+def test_parse_line_matches_reference():
+    for line in LINES:
+        assert P.parse_line(line) == _reference_parse_line(line), line
+
+
+def test_parse_lines_matches_reference():
+    assert list(P.parse_lines(LINES)) == [d for d in map(_reference_parse_line, LINES) if d]
+
+
+def test_case_variants_parse_and_non_notice_lines_do_not():
+    assert P.parse_line(KILL.replace("<Actor Death>", "<actor death>"))["victim_id"] == 2004812211934
+    assert P.parse_line(KILL.replace("[Notice]", "[Trace]")) is None
@@ -0,0 +1,126 @@
+"""Query and row budgets per endpoint, so an N+1 or a relationship load on a hot path fails here.
+
+Queries are cursor executions on the engine; rows loaded are ORM instances put in a
+session's identity map (column-only projections load none).
+"""
+from contextlib import contextmanager
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from backend.app import app
+from backend.database import Base, engine
+from backend.migrations import stamp_version
+
+KEY = {"X-API-Key": "test-client-key"}
+PIRATES = [f"QcPirate{i}" for i in range(3)]
+KILLS_PER_PIRATE = 10
+
+
+def _event(attacker: str, victim: str, i: int) -> dict:
+    return {"timestamp": f"2026-01-01T00:{i // 60:02d}:{i % 60:02d}Z", "attacker_name": attacker, "victim_name": victim,
+            "zone": "Stanton", "coords": {"x": 1000.0 * i, "y": 0.0, "z": 0.0}, "damage_type": "VehicleDestruction",
+            "ship_value_estimate": 100.0}
+
+
+class Counter:
+    def __init__(self):
+        self.queries = 0
+        self.rows = 0
+
+
+@contextmanager
+def counting():
+    c = Counter()
+
+    def on_execute(*_):
+        c.queries += 1
+
+    def on_load(session, instance):
+        c.rows += 1
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    event.listen(Session, "loaded_as_persistent", on_load)
+    try:
+        yield c
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+        event.remove(Session, "loaded_as_persistent", on_load)
+
+
+@pytest.fixture(scope="module")
+def client():
+    Base.metadata.create_all(bind=engine)
+    stamp_version(engine)
+    c = TestClient(app)  # no lifespan: no startup task or enrichment workers
+    batch = [_event(p, f"QcMember{i % 4}", n * KILLS_PER_PIRATE + i)
+             for n, p in enumerate(PIRATES) for i in range(KILLS_PER_PIRATE)]
+    r = c.post("/api/v1/events/batch", json=batch, headers=KEY)
+    assert r.status_code == 200 and r.json()["inserted"] == len(batch)
+    return c
+
+
+def _player_id(client, name):
+    return client.get("/api/v1/pirates/by-name", params={"name": name}).json()["player_id"]
+
+
+# path -> (max queries, max ORM rows loaded, or a function of the response body giving it)
+READ_BUDGETS = {
+    "/api/v1/pirates/by-name?name=QcPirate1": (1, 0),
+    "/api/v1/bounties": (1, 0),
+    "/api/v1/heatmap": (1, lambda body: len(body["hotspots"])),  # one body_stats row per hotspot
+    "/api/v1/roster": (1, 0),
+    "/api/v1/events?limit=10": (1, 10 + 1),  # keyset pages read one extra row to find next_cursor
+    "/api/v1/events?attacker=QcPirate2&limit=50": (1, KILLS_PER_PIRATE),
+}
+
+
+@pytest.mark.parametrize("path", READ_BUDGETS)
+def test_read_endpoint_budget(client, path):
+    max_queries, max_rows = READ_BUDGETS[path]
+    with counting() as c:
+        r = client.get(path)
+    assert r.status_code == 200
+    if callable(max_rows):
+        max_rows = max_rows(r.json())
+    assert c.queries <= max_queries, f"{path}: {c.queries} queries"
+    assert c.rows <= max_rows, f"{path}: {c.rows} ORM rows loaded"
+
+
+def test_pirate_by_id_skips_event_history(client):
+    pid = _player_id(client, "QcPirate0")
+    with counting() as c:
+        r = client.get(f"/api/v1/pirates/{pid}")
+    assert r.status_code == 200 and r.json()["total_kills"] == KILLS_PER_PIRATE
+    assert c.queries <= 1
+    assert c.rows == 0
+
+
+def test_pirate_orgs_only_when_asked(client):
+    with counting() as c:
+        client.get("/api/v1/pirates/by-name", params={"name": "QcPirate0", "include": "orgs"})
+    assert c.queries <= 2
+    assert c.rows == 0
+
+
+def test_post_event_is_constant_in_history(client):
+    """A pirate with many stored kills costs the same to ingest as a new one."""
+    with counting() as c:
+        r = client.post("/api/v1/events", json=_event("QcPirate0", "QcMember0", 999), headers=KEY)
+    assert r.status_code == 200
+    assert c.queries <= 8, f"{c.queries} queries"
+    assert c.rows == 0
+
+
+def test_batch_ingest_does_not_scale_queries_with_size(client):
+    small = [_event(f"QcBatchA{i}", "QcMember1", 500 + i) for i in range(2)]
+    large = [_event(f"QcBatchB{i}", "QcMember1", 600 + i) for i in range(40)]
+    with counting() as c_small:
+        client.post("/api/v1/events/batch", json=small, headers=KEY).raise_for_status()
+    with counting() as c_large:
+        client.post("/api/v1/events/batch", json=large, headers=KEY).raise_for_status()
+    # SQLite runs the batched INSERT ... RETURNING row by row; everything else is per batch
+    assert c_large.queries - c_small.queries <= len(large) - len(small)
+    assert c_large.rows == 0
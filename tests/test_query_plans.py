@@ -0,0 +1,86 @@
+"""GET /events search plans: every filter pages through its (column, event_id) index.
+
+Runs EXPLAIN QUERY PLAN on the statement search_events issues, for the first page and a
+page behind a cursor, so a dropped index or a change that turns a page into a table
+scan or a sort fails here rather than only under bench/event_search_check.py.
+"""
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, text
+
+from backend.database import Base, SessionLocal, engine
+from backend.migrations import stamp_version
+from backend.models import Event
+from backend.routers.events import search_events
+
+N_EVENTS = 3000
+LIMIT = 20
+T0 = datetime(2031, 1, 1)
+
+# case -> (filters, since, until, index the page must be read through)
+CASES = {
+    "attacker": ({"attacker_name": "QpPirate3"}, None, None, "ix_events_attacker_name_id"),
+    "victim": ({"victim_name": "QpVictim4"}, None, None, "ix_events_victim_name_id"),
+    "org": ({"attacker_org": "QpORG2"}, None, None, "ix_events_attacker_org_id"),
+    "zone": ({"zone": "QpZone1"}, None, None, "ix_events_zone_id"),
+    "damage_type": ({"damage_type": "QpCrash"}, None, None, "ix_events_damage_type_id"),
+    "unconfirmed": ({"confirmed": False}, None, None, "ix_events_confirmed_id"),
+    "time window": ({}, T0 + timedelta(hours=5), T0 + timedelta(hours=30), "ix_events_occurred_at_id"),
+    "since only": ({}, T0 + timedelta(hours=40), None, "ix_events_occurred_at_id"),
+}
+
+
+@pytest.fixture(scope="module")
+def db():
+    Base.metadata.create_all(bind=engine)
+    stamp_version(engine)
+    rng = random.Random(3)
+    rows = [{
+        "timestamp": (T0 + timedelta(minutes=i)).isoformat(), "occurred_at": T0 + timedelta(minutes=i),
+        "attacker_name": f"QpPirate{rng.randrange(20)}", "attacker_org": rng.choice([f"QpORG{i}" for i in range(5)] + [None]),
+        "victim_name": f"QpVictim{rng.randrange(50)}", "zone": f"QpZone{rng.randrange(8)}",
+        "damage_type": rng.choice(["QpCrash", "QpBullet", "QpVehicleDestruction"]),
+        "ship_value_estimate": 0.0, "confirmed": rng.random() > 0.02,
+    } for i in range(N_EVENTS)]
+    with engine.begin() as conn:
+        conn.execute(Event.__table__.insert(), rows)
+        conn.execute(text("ANALYZE"))
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+def _page_statement(db, filters, since, until, cursor):
+    statements = []
+
+    def capture(conn, cursor_, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        page = search_events(db, filters, since, until, cursor, LIMIT)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    assert len(statements) == 1, f"{len(statements)} statements for one page (N+1?)"
+    return page, statements[0]
+
+
+def _plan(statement, parameters) -> str:
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+    return "\n".join(r[-1] for r in rows)
+
+
+@pytest.mark.parametrize("case", CASES)
+def test_search_page_reads_its_index(db, case):
+    filters, since, until, index = CASES[case]
+    first, stmt = _page_statement(db, filters, since, until, None)
+    assert first.next_cursor is not None, "seed data should span more than one page"
+    _, deep_stmt = _page_statement(db, filters, since, until, first.next_cursor)
+    for plan in (_plan(*stmt), _plan(*deep_stmt)):
+        assert index in plan, f"{case}: page not read through {index}:\n{plan}"
+        assert not any(l.strip().startswith("SCAN events") and "USING" not in l for l in plan.splitlines()), \
+            f"{case}: full scan of events:\n{plan}"
+        assert "TEMP B-TREE FOR ORDER BY" not in plan, f"{case}: page sorts its matches:\n{plan}"
@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from backend.timeparse import event_time, parse_ts
+
+RECEIVED = datetime(2026, 3, 1, 12, 0, 0)
+
+
+def test_game_log_year_maps_to_utc():
+    assert parse_ts("2949-09-23 21:23:24.123") == datetime(2019, 9, 23, 21, 23, 24, 123000)
+    assert parse_ts("<2949-09-23 21:23:24.123>") == datetime(2019, 9, 23, 21, 23, 24, 123000)
+
+
+def test_game_log_time_is_kept_as_event_time():
+    assert event_time("2955-12-31 23:59:59.000", RECEIVED) == datetime(2025, 12, 31, 23, 59, 59)
+
+
+def test_game_leap_day_on_common_year():
+    assert parse_ts("2952-02-29 10:00:00") == datetime(2022, 2, 28, 10, 0, 0)
+
+
+def test_iso_offsets_normalised_to_naive_utc():
+    assert parse_ts("2026-01-01T02:00:00+02:00") == datetime(2026, 1, 1, 0, 0, 0)
+    assert parse_ts("2026-01-01T00:00:00Z") == datetime(2026, 1, 1, 0, 0, 0)
+
+
+def test_unplaceable_timestamps_are_none_not_now():
+    assert event_time("not a time", RECEIVED) is None
+    assert event_time(None, RECEIVED) is None
+    assert event_time("2026-03-05T00:00:00Z", RECEIVED) is None  # beyond MAX_FUTURE_SKEW